@@ -1,6 +1,30 @@
 import copy
 import random
-import pickle
+import time
+from bitboard import Position, popcount
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from evalcache import EvaluationCache
+from ordering import MoveOrderer
+from tables import EvaluationTables
+from stats import SearchStats
+from openingbook import DEFAULT_BOOK, get_book
+from evaluation import (IncrementalEvaluator, WIN_VALUE, CENTER_PIECES_VALUE,
+                        TWO_PIECES_VALUE, THREE_PIECES_VALUE)
+
+# xor-ed to the key of a position when the opponent is the one to move
+MIN_TURN_KEY = 0x9E3779B97F4A7C15
+
+# number of nodes between two checks of the clock in a timed search
+CLOCK_CHECK_NODES = 1024
+
+# half width of the window around the value of the previous iteration,
+# a value for the aspiration_window of Minimax_AI
+ASPIRATION_WINDOW = 16
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit of a move is over, or
+    when pondering is stopped."""
 
 
 class Minimax_AI:
@@ -12,9 +36,27 @@ class Minimax_AI:
         * opponent - > the role of opponent (player 1 or player 2)
         * board_rows -> number of rows in board
         * board_columns -> number of columns in board
+        * connect -> number of pieces in a row that win
+        * table -> TranspositionTable shared by all the moves of a game
+        * eval_cache -> EvaluationCache of the values of the leaves, or None
+        * book -> OpeningBook used for the first moves, or None
+        * searched_depth -> depth of the last completed search
+        * nodes -> number of nodes searched in the last move
+        * workers -> number of processes used by the search
+        * stats -> SearchStats of the last move, or None without stats
+        * pondering -> True while the search started by ponder runs
+        * progress -> (completed depth, depth being searched, nodes) of make_move
+        * principal_variation -> columns of the best line found by the last move
+        * value -> score of the last move searched by minimax, None for a
+            move of the book or the solver
 
     It has the next public methods:
-        * make_move(board) -> makes a move in game for board position
+        * make_move(board, time_limit_ms) -> makes a move in game for board position
+        * ponder(board) -> searches the replies of the opponent in the background
+        * stop_pondering() -> stops the search started by ponder
+        * cancel() -> stops the make_move running in another thread
+        * clear_cancel() -> forgets a cancel before a new make_move
+        * close() -> stops pondering and the processes of a parallel search
 
     It has the next private methods for functioning
         * _to_move(board) -> returns which player to move in board position
@@ -23,19 +65,103 @@ class Minimax_AI:
         * _is_endgame(board) -> returns True if board is in a end of game position
         * _utility(board, piece) -> returns the numerical value of a board position
         * _minimax(board, current_depth, max_turn, alpha, beta, node)
+
+    The search itself runs on a bitboard Position (see bitboard.py) that is
+    modified in place, the methods above are kept for list/NumPy boards:
+        * _search(position, depth, max_turn, alpha, beta) -> minimax on position
+        * _evaluate(position) -> same value as _utility for position
+        * _threat_score(position) -> value of the threats of both players
+        * _threat_moves(position, depth, max_turn, table_move) -> moves left by the threats
+        * _leaf_value(position) -> value of a leaf of _search, cached
+        * _deepen(position, time_limit_ms) -> iterative deepening search
+        * _search_window(position, depth, previous) -> search with an aspiration window
+        * _read_variation(position, length) -> best line stored in the table
+        * _use_solver(position) -> returns True if the Solver chooses the move
+        * _store(key, mirrored, depth, flag, value, move) -> saves in the table
+        * _search_parallel(position, depth) -> _search with the root moves in processes
+        * _make_move(board, time_limit_ms) -> make_move without clearing cancel
+        * _finish_stats(col, source) -> saves and writes the statistics of a move
+        * _ponder(position) -> searches the replies of the opponent in position
     """
 
-    def __init__(self, depth, player, rows, columns):
-        """Create AI instance with depth and player variables."""
+    def __init__(self, depth, player, rows, columns, table_mb=16, seed=None, workers=1,
+                 book=DEFAULT_BOOK, solver_cells=18, connect=4, stats=False,
+                 stats_file=None, threat_value=0, eval_cache_mb=0, pvs=True,
+                 aspiration_window=0):
+        """Create AI instance with depth and player variables.
+        table_mb is the memory cap in megabytes of the transposition table.
+        seed is None for a deterministic search, or a number to shuffle
+        the moves with the same ordering score (see ordering.py).
+        With workers > 1 the moves of the root are searched in a pool of
+        processes (see parallel.py).
+        book is the path of the opening book file, or None to always search.
+        A relative path is taken from the directory of the package, and the
+        book is opened once per process and shared (see get_book).
+        When there are solver_cells empty cells or less the move is chosen by
+        the perfect play Solver instead of minimax, 0 to never use it.
+        connect is the number of pieces in a row that win the game.
+        With stats every move keeps its SearchStats (see stats.py), and
+        with stats_file (an open text file) they are also written to it as
+        one line of JSON per move. Without them the search does not count.
+        threat_value is added to the value of the leaves of the search for
+        every threat of the player (an empty cell that would complete a
+        line) in a row of its parity, and subtracted for the opponent (see
+        EvaluationTables.threat_masks). THREAT_VALUE is a good value, with
+        0 the values are the ones of _utility.
+        eval_cache_mb is the memory cap in megabytes of a cache of the
+        values of the leaves (see evalcache.py), 0 to evaluate every leaf.
+        The evaluator makes a leaf cheap, so the cache only pays when few
+        positions are new, it is off by default.
+        With pvs the search is a principal variation search: every move
+        after the first one is tried with a null window (see _search).
+        The values are integers, so the null window is one point wide.
+        With aspiration_window an iterative deepening search starts every
+        depth with the window of that half width around the value of the
+        previous depth (see _search_window), 0 for the whole window."""
         self._depth = depth
         self._player = player
         self._board_rows = rows
         self._board_columns = columns
+        self._connect = connect
+        self._tables = EvaluationTables.get(rows, columns, connect)
         if self._player == 1:
             self._opponent = 2
         else:
             self._opponent = 1
-        self._firstmove = self._getfirstmove(self._player)
+        self._book = self._getbook(book)
+        self._solver_cells = solver_cells
+        # created by _use_solver the first time it is needed
+        self._solver = None
+        self._table_mb = table_mb
+        self._table = TranspositionTable(table_mb)
+        self._orderer = MoveOrderer(rows, columns, seed)
+        self._evaluator = IncrementalEvaluator(rows, columns, player, connect)
+        self._searched_depth = 0
+        self._nodes = 0
+        self._deadline = None
+        self._workers = workers
+        self._record_stats = stats or stats_file is not None
+        self._stats_file = stats_file
+        self._stats = None
+        self._ponder_thread = None
+        self._move_counters = (0, None)
+        self._cancelled = False
+        self._iteration_depth = 0
+        self._threat_value = threat_value
+        self._eval_cache = EvaluationCache(eval_cache_mb) if eval_cache_mb > 0 else None
+        self._pvs = pvs
+        self._aspiration_window = aspiration_window
+        self._principal_variation = []
+        self._value = None
+        self._pool = None
+        if workers > 1:
+            from parallel import SearchPool
+            self._pool = SearchPool(workers, table_mb, threat_value)
+        self._center_mask = self._tables.center_mask
+        # column of every bit of a Position, and the move list of a forced move
+        self._bit_columns = [bit // self._tables.stride
+                             for bit in range(columns * self._tables.stride)]
+        self._single_moves = [(col,) for col in range(columns)]
 
     @property
     def depth(self):
@@ -57,31 +183,370 @@ class Minimax_AI:
     def opponent(self):
         return self._opponent
 
-    def _getfirstmove(self, player):
-        if player == 1:
-            with open('firstmove1', 'rb') as filemove:
-                firstmove = pickle.load(filemove)
-            return firstmove
-        else:
-            with open('firstmove2', 'rb') as filemove:
-                firstmove = pickle.load(filemove)
-            return firstmove
-
-    def make_move(self, board):
-        """Returns the number of the optimal column to insert a piece by using minimax."""
-        board_str = ''
-        for r in board:
-            for c in r:
-                board_str = board_str + str(c)
-
-        move = self._firstmove.get(board_str, -1)
-        if move != -1:
-            return move
-
-        value, col = self._minimax(
-            board, 0, True, float('-inf'), float('inf'), 0)
+    @property
+    def connect(self):
+        return self._connect
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def principal_variation(self):
+        return list(self._principal_variation)
+
+    @property
+    def eval_cache(self):
+        return self._eval_cache
+
+    @property
+    def book(self):
+        return self._book
+
+    @property
+    def searched_depth(self):
+        return self._searched_depth
+
+    @property
+    def nodes(self):
+        if self._ponder_thread is not None:
+            return self._move_counters[0]
+        return self._nodes
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def stats(self):
+        if self._ponder_thread is not None:
+            return self._move_counters[1]
+        return self._stats
+
+    @property
+    def progress(self):
+        """(depth of the last completed search, depth being searched, nodes)
+        of the running make_move, it can be read from another thread."""
+        return self._searched_depth, self._iteration_depth, self._nodes
+
+    @property
+    def pondering(self):
+        return self._ponder_thread is not None and self._ponder_thread.is_alive()
+
+    def ponder(self, board):
+        """Starts searching, in a background thread, the positions after the
+        replies of the opponent to board, the expected reply first.
+        The results stay in the transposition table, so the next make_move
+        finds them instead of searching again. make_move stops the thread."""
+        self.stop_pondering()
+        position = Position.from_status(
+            board, self._board_rows, self._board_columns, self._connect)
+        if position.is_win(1) or position.is_win(2) or position.is_full():
+            return
+        # imported here, most processes (the service, the arena) never ponder
+        import threading
+        # the thread counts its nodes in _nodes, without statistics: the
+        # counters of the last move are kept apart until stop_pondering
+        self._move_counters = (self._nodes, self._stats)
+        self._stats = None
+        # the thread never sets the deadline, so stop_pondering can end it
+        self._deadline = float('inf')
+        self._ponder_thread = threading.Thread(
+            target=self._ponder, args=(position,), daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self):
+        """Stops the search started by ponder and waits for it to end."""
+        if self._ponder_thread is not None:
+            # the search raises SearchTimeout at the next clock check
+            self._deadline = float('-inf')
+            self._ponder_thread.join()
+            self._nodes, self._stats = self._move_counters
+            self._ponder_thread = None
+            # keep the deadline of a cancel that came meanwhile
+            self._deadline = float('-inf') if self._cancelled else None
+
+    def cancel(self):
+        """Stops the make_move running in another thread, that returns None.
+        A cancel before the make_move starts stops it too, use clear_cancel
+        before starting the thread."""
+        self._cancelled = True
+        # the search raises SearchTimeout at its next clock check
+        self._deadline = float('-inf')
+
+    def clear_cancel(self):
+        """Forgets a cancel of a make_move that already ended, call it
+        before starting a make_move in another thread."""
+        self._cancelled = False
+
+    def close(self):
+        """Stops pondering and the processes of a parallel search."""
+        self.stop_pondering()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _getbook(self, path):
+        """Returns the opening book in path if it is for boards of this size.
+        The books are searched for connect4, other games do not use them."""
+        if path is None or self._connect != 4:
+            return None
+        book = get_book(path)
+        if (book.rows, book.columns) != (self._board_rows, self._board_columns):
+            return None
+        return book
+
+    def make_move(self, board, time_limit_ms=None):
+        """Returns the number of the optimal column to insert a piece by using minimax.
+        Without time_limit_ms the search goes depth moves ahead. With
+        time_limit_ms the depth is ignored: the search goes one move deeper
+        at a time and returns the best move of the deepest completed search
+        when the time is over.
+        Near the end of the game (see solver_cells) the move is the one of
+        perfect play.
+        Returns None if cancel is called while the move is searched, or
+        before it starts. The cancel is forgotten when make_move returns."""
+        try:
+            return self._make_move(board, time_limit_ms)
+        finally:
+            self._cancelled = False
+
+    def _make_move(self, board, time_limit_ms):
+        """make_move without clearing the cancel at the end."""
+        self.stop_pondering()
+        # a cancel that came while pondering was stopped
+        if self._cancelled:
+            return None
+        self._nodes = 0
+        self._principal_variation = []
+        self._value = None
+        position = Position.from_status(
+            board, self._board_rows, self._board_columns, self._connect)
+        if self._record_stats:
+            self._stats = SearchStats(self._player, position.count)
+        if self._book is not None:
+            move = self._book.lookup(position, self._player)
+            if move is not None:
+                self._principal_variation = [move]
+                return self._finish_stats(move, 'book')
+        if self._use_solver(position):
+            solver_nodes = self._solver.nodes
+            col, score = self._solver.best_move(position, self._player)
+            self._nodes = self._solver.nodes - solver_nodes
+            self._principal_variation = [col]
+            return self._finish_stats(col, 'solver')
+
+        self._table.new_search()
+        self._orderer.new_search()
+        self._evaluator.reset(position)
+        if time_limit_ms is not None:
+            col = self._deepen(position, time_limit_ms)
+            if self._cancelled:
+                return None
+            # the search stopped by the clock leaves its moves in position
+            position = Position.from_status(
+                board, self._board_rows, self._board_columns, self._connect)
+            self._principal_variation = self._read_variation(position, self._searched_depth)
+            return self._finish_stats(col, 'search')
+
+        self._iteration_depth = self._depth
+        self._searched_depth = 0
+        # no time limit, the deadline is only there for cancel
+        self._deadline = float('inf')
+        if self._cancelled:
+            return None
+        if self._stats is not None:
+            self._stats.start_iteration(self._depth, self._nodes, self._table, self._eval_cache)
+        try:
+            if self._pool is not None:
+                value, col = self._search_parallel(position, self._depth)
+            else:
+                value, col = self._search(
+                    position, self._depth, True, float('-inf'), float('inf'))
+        except SearchTimeout:
+            return None
+        finally:
+            self._deadline = None
+        if self._stats is not None:
+            self._stats.end_iteration(self._nodes, self._table, cache=self._eval_cache)
+        self._searched_depth = self._depth
+        self._value = value
+        self._principal_variation = self._read_variation(position, self._depth)
+        return self._finish_stats(col, 'search')
+
+    def _finish_stats(self, col, source):
+        """Saves col and source in the statistics of the move, writes them to
+        the stats file and returns col."""
+        if self._stats is not None:
+            self._stats.finish(col, source, self._nodes, self._principal_variation)
+            if self._stats_file is not None:
+                self._stats_file.write(self._stats.to_json() + '\n')
+        return col
+
+    def _ponder(self, position):
+        """Searches with iterative deepening, up to depth, the position
+        after every reply of the opponent in position. Runs in the thread
+        of ponder until the end or until stop_pondering."""
+        key, mirrored = position.canonical_key()
+        entry = self._table.get(key ^ MIN_TURN_KEY)
+        expected = entry[3] if entry is not None else None
+        if mirrored and expected is not None:
+            expected = self._board_columns - 1 - expected
+        replies = list(self._orderer.order(position, self._opponent, expected))
+        try:
+            for reply in replies:
+                position.play(reply, self._opponent)
+                if not (position.is_win(self._opponent) or position.is_full()
+                        or self._use_solver(position)
+                        or (self._book is not None and self._book.lookup(position, self._player) is not None)):
+                    self._evaluator.reset(position)
+                    for depth in range(1, self._depth + 1):
+                        self._search(position, depth, True, float('-inf'), float('inf'))
+                position.undo()
+        except SearchTimeout:
+            pass
+
+    def _use_solver(self, position):
+        """Returns True if the Solver has to choose the move in position."""
+        empty_cells = self._board_rows * self._board_columns - position.count
+        if not 0 < empty_cells <= self._solver_cells:
+            return False
+        # the solver needs the AI to be the player to move
+        to_move = 1 if position.count % 2 == 0 else 2
+        if to_move != self._player:
+            return False
+        if position.is_win(1) or position.is_win(2):
+            return False
+        if self._solver is None:
+            self._solver = Solver(self._board_rows, self._board_columns, self._table_mb)
+        return True
+
+    def _search_parallel(self, position, depth):
+        """Returns the same value and column as _search from the root.
+        The first move is searched here to get a bound for the others, that
+        are searched at the same time by the processes of the pool."""
+        if depth == 0 or position.is_win(self._player) or position.is_win(self._opponent) or position.is_full():
+            return self._search(position, depth, True, float('-inf'), float('inf'))
+
+        self._nodes += 1
+        key, mirrored = position.canonical_key()
+        entry = self._table.get(key)
+        table_move = entry[3] if entry is not None else None
+        if mirrored and table_move is not None:
+            table_move = self._board_columns - 1 - table_move
+        # the same moves as _search, so both choose the same column
+        value, col, list_of_actions, unsafe = self._threat_moves(
+            position, depth, True, table_move)
+        if value is not None:
+            return value, col
+        list_of_actions = [action for action in list_of_actions
+                           if not unsafe >> position.heights[action] & 1]
+
+        action_target = list_of_actions[0]
+        self._evaluator.play(position.heights[action_target], self._player)
+        position.play(action_target, self._player)
+        best_value, col_child = self._search(
+            position, depth-1, False, float('-inf'), float('inf'))
+        position.undo()
+        self._evaluator.undo(position.heights[action_target], self._player)
+
+        results = self._pool.search_moves(
+            position, list_of_actions[1:], depth-1, self._player, best_value)
+        for action, (value_child, nodes) in zip(list_of_actions[1:], results):
+            self._nodes += nodes
+            if best_value < value_child:
+                best_value = value_child
+                action_target = action
+
+        self._store(key, mirrored, depth, EXACT, best_value, action_target)
+        return best_value, action_target
+
+    def _store(self, key, mirrored, depth, flag, value, move):
+        """Saves a result in the transposition table, with move mirrored if
+        key is the one of the mirror image of the position."""
+        if mirrored and move is not None:
+            move = self._board_columns - 1 - move
+        self._table.store(key, depth, flag, value, move)
+
+    def _deepen(self, position, time_limit_ms):
+        """Searches position with depth 1, 2, 3... until time_limit_ms is over
+        and returns the column of the deepest completed search.
+        Each search stores its best moves in the transposition table, so the
+        next one tries them first. Depth 1 is always completed."""
+        deadline = time.perf_counter() + time_limit_ms / 1000
+        empty_cells = self._board_rows * self._board_columns - position.count
+        col = None
+        value = None
+        self._searched_depth = 0
+        for depth in range(1, empty_cells + 1):
+            self._iteration_depth = depth
+            # set before looking at _cancelled, so a cancel is never overwritten
+            self._deadline = deadline if depth > 1 else float('inf')
+            if self._cancelled:
+                break
+            if self._stats is not None:
+                self._stats.start_iteration(depth, self._nodes, self._table, self._eval_cache)
+            try:
+                value, col = self._search_window(position, depth, value)
+            except SearchTimeout:
+                if self._stats is not None:
+                    self._stats.end_iteration(self._nodes, self._table, completed=False,
+                                              cache=self._eval_cache)
+                break
+            if self._stats is not None:
+                self._stats.end_iteration(self._nodes, self._table, cache=self._eval_cache)
+            self._searched_depth = depth
+            self._value = value
+            # a forced win or loss does not change with more depth
+            if abs(value) >= WIN_VALUE or time.perf_counter() >= deadline:
+                break
+        self._deadline = None
         return col
 
+    def _search_window(self, position, depth, previous):
+        """Searches position at depth for _deepen. With aspiration_window
+        the window is around previous, the value of the previous depth,
+        and the search is repeated with the whole window if the value is
+        out of it. Returns the score and the column."""
+        window = self._aspiration_window
+        if window and previous is not None and abs(previous) < WIN_VALUE:
+            alpha = previous - window
+            beta = previous + window
+            value, col = self._search(position, depth, True, alpha, beta)
+            if alpha < value < beta:
+                return value, col
+        return self._search(position, depth, True, float('-inf'), float('inf'))
+
+    def _read_variation(self, position, length):
+        """Returns the columns of the best line of play from position, read
+        from the moves of the transposition table, with at most length
+        moves. The line ends early if an entry was replaced or the game ends."""
+        variation = []
+        max_turn = True
+        while len(variation) < length:
+            key, mirrored = position.canonical_key()
+            if not max_turn:
+                key ^= MIN_TURN_KEY
+            entry = self._table.peek(key)
+            if entry is None or entry[3] is None:
+                break
+            col = self._board_columns - 1 - entry[3] if mirrored else entry[3]
+            if not position.can_play(col):
+                break
+            piece = self._player if max_turn else self._opponent
+            position.play(col, piece)
+            variation.append(col)
+            if position.is_win(piece) or position.is_full():
+                break
+            max_turn = not max_turn
+        for _ in variation:
+            position.undo()
+        return variation
+
     def _to_move(self, board_status):
         """returns which player to move in board position."""
         player1_pieces = 0
@@ -119,29 +584,13 @@ class Minimax_AI:
 
     def _is_endgame(self, board_status, player):
         """Returns True if board is in a winning position for player."""
-        # Check horizontal locations for win
-        for c in range(self._board_columns-3):
-            for r in range(self._board_rows):
-                if board_status[r][c] == player and board_status[r][c+1] == player and board_status[r][c+2] == player and board_status[r][c+3] == player:
-                    return True
-
-        # Check vertical locations for win
-        for c in range(self._board_columns):
-            for r in range(self._board_rows-3):
-                if board_status[r][c] == player and board_status[r+1][c] == player and board_status[r+2][c] == player and board_status[r+3][c] == player:
-                    return True
-
-        # Check positively sloped diaganols
-        for c in range(self._board_columns-3):
-            for r in range(self._board_rows-3):
-                if board_status[r][c] == player and board_status[r+1][c+1] == player and board_status[r+2][c+2] == player and board_status[r+3][c+3] == player:
-                    return True
-
-        # Check negatively sloped diaganols
-        for c in range(self._board_columns-3):
-            for r in range(3, self._board_rows):
-                if board_status[r][c] == player and board_status[r-1][c+1] == player and board_status[r-2][c+2] == player and board_status[r-3][c+3] == player:
-                    return True
+        # every line of connect cells: horizontal, vertical and both diagonals
+        for line in self._tables.lines:
+            for r, c in line:
+                if board_status[r][c] != player:
+                    break
+            else:
+                return True
 
     def _is_tie(self, board):
         """Returns True if the board position is a tie."""
@@ -169,99 +618,47 @@ class Minimax_AI:
 
         For opponent pieces the values are the same but negative.
 
-        For looking consecutive pieces we create windows of lenght 4.
+        For looking consecutive pieces we create windows of lenght connect,
+        the lines of the EvaluationTables of the board.
         """
-        window_len = 4
-        center_pieces_value = 3
-        player_two_pieces_value = 2
-        opponent_two_pieces_value = 2
-        player_three_pieces_value = 5
-        opponent_three_pieces_value = 5
+        center_pieces_value = CENTER_PIECES_VALUE
+        player_two_pieces_value = TWO_PIECES_VALUE
+        opponent_two_pieces_value = TWO_PIECES_VALUE
+        player_three_pieces_value = THREE_PIECES_VALUE
+        opponent_three_pieces_value = THREE_PIECES_VALUE
+        three = self._connect - 1
+        two = self._connect - 2
         value = 0
         if self._is_tie(board_status):
             return value
         if self._is_endgame(board_status, self._player):
-            value = 1000
+            value = WIN_VALUE
             return value
         if self._is_endgame(board_status, self._opponent):
-            value = -1000
+            value = -WIN_VALUE
             return value
 
         # non final position
 
-        # check center column for player pieces
-        center_column = [int(i) for i in list(
-            board_status[:, self._board_columns//2])]
-        center_count = center_column.count(self._player)
-        value += center_count * center_pieces_value
+        # check center column for player and opponent pieces
+        center_column = [int(board_status[r][self._board_columns//2])
+                         for r in range(self._board_rows)]
+        value += center_column.count(self._player) * center_pieces_value
+        value -= center_column.count(self._opponent) * center_pieces_value
 
-        # check center column for opponent pieces
-        center_column = [int(i) for i in list(
-            board_status[:, self._board_columns//2])]
-        center_count = center_column.count(self._opponent)
-        value -= center_count * center_pieces_value
-
-        # check horizontal consecutive pieces
-        for r in range(self._board_rows):
-            row_array = [int(i) for i in list(board_status[r, :])]
-            for c in range(self._board_columns-3):
-                window = row_array[c:c+window_len]
-                # add player values
-                if window.count(self._player) == 3 and window.count(0) == 1:
-                    value += player_three_pieces_value
-                elif window.count(self._player) == 2 and window.count(0) == 2:
-                    value += player_two_pieces_value
-                # subtract opponent values
-                elif window.count(self._opponent) == 3 and window.count(0) == 1:
-                    value -= opponent_three_pieces_value
-                elif window.count(self._opponent) == 2 and window.count(0) == 2:
-                    value -= opponent_two_pieces_value
-
-        # check vertical consecutive pieces
-        for c in range(self._board_columns):
-            col_array = [int(i) for i in list(board_status[:, c])]
-            for r in range(self._board_rows-3):
-                window = col_array[r:r+window_len]
-                # add player values
-                if window.count(self._player) == 3 and window.count(0) == 1:
-                    value += player_three_pieces_value
-                elif window.count(self._player) == 2 and window.count(0) == 2:
-                    value += player_two_pieces_value
-                # subtract opponent values
-                elif window.count(self._opponent) == 3 and window.count(0) == 1:
-                    value -= opponent_three_pieces_value
-                elif window.count(self._opponent) == 2 and window.count(0) == 2:
-                    value -= opponent_two_pieces_value
-
-        # check positive sloped diagonal
-        for r in range(self._board_rows-3):
-            for c in range(self._board_columns-3):
-                window = [board_status[r+i][c+i] for i in range(window_len)]
-                # add player values
-                if window.count(self._player) == 3 and window.count(0) == 1:
-                    value += player_three_pieces_value
-                elif window.count(self._player) == 2 and window.count(0) == 2:
-                    value += player_two_pieces_value
-                # subtract opponent values
-                elif window.count(self._opponent) == 3 and window.count(0) == 1:
-                    value -= opponent_three_pieces_value
-                elif window.count(self._opponent) == 2 and window.count(0) == 2:
-                    value -= opponent_two_pieces_value
-
-        # check negative sloped diagonal
-        for r in range(self._board_rows-3):
-            for c in range(self._board_columns-3):
-                window = [board_status[r+3-i][c+i] for i in range(window_len)]
-                # add player values
-                if window.count(self._player) == 3 and window.count(0) == 1:
-                    value += player_three_pieces_value
-                elif window.count(self._player) == 2 and window.count(0) == 2:
-                    value += player_two_pieces_value
-                # subtract opponent values
-                elif window.count(self._opponent) == 3 and window.count(0) == 1:
-                    value -= opponent_three_pieces_value
-                elif window.count(self._opponent) == 2 and window.count(0) == 2:
-                    value -= opponent_two_pieces_value
+        # check consecutive pieces of every line
+        for line in self._tables.lines:
+            window = [board_status[r][c] for r, c in line]
+            # add player values
+            if window.count(self._player) == three and window.count(0) == 1:
+                value += player_three_pieces_value
+            elif window.count(self._player) == two and window.count(0) == 2:
+                value += player_two_pieces_value
+            # subtract opponent values
+            elif window.count(self._opponent) == three and window.count(0) == 1:
+                value -= opponent_three_pieces_value
+            elif window.count(self._opponent) == two and window.count(0) == 2:
+                value -= opponent_two_pieces_value
 
         # return value
         return value
@@ -306,3 +703,370 @@ class Minimax_AI:
                         break
 
         return best_value, action_target
+
+    def _evaluate(self, position):
+        """Bitboard version of _utility, returns the same value for position."""
+        player_win = position.is_win(self._player)
+        opponent_win = position.is_win(self._opponent)
+        if position.is_full() and not player_win and not opponent_win:
+            return 0
+        if player_win:
+            return WIN_VALUE
+        if opponent_win:
+            return -WIN_VALUE
+
+        player_board = position.bitboards[self._player]
+        opponent_board = position.bitboards[self._opponent]
+        value = CENTER_PIECES_VALUE * (popcount(player_board & self._center_mask)
+                                       - popcount(opponent_board & self._center_mask))
+
+        three = self._connect - 1
+        two = self._connect - 2
+        for window in position.window_masks():
+            player_pieces = popcount(player_board & window)
+            opponent_pieces = popcount(opponent_board & window)
+            if opponent_pieces == 0:
+                if player_pieces == three:
+                    value += THREE_PIECES_VALUE
+                elif player_pieces == two:
+                    value += TWO_PIECES_VALUE
+            elif player_pieces == 0:
+                if opponent_pieces == three:
+                    value -= THREE_PIECES_VALUE
+                elif opponent_pieces == two:
+                    value -= TWO_PIECES_VALUE
+        return value
+
+    def _threat_score(self, position):
+        """Returns threat_value times the threats of the player minus the
+        threats of the opponent in position, counting only the ones in
+        the rows of the parity of each player."""
+        masks = self._tables.threat_masks
+        player_threats = position.winning_cells(self._player) & masks[self._player]
+        opponent_threats = position.winning_cells(self._opponent) & masks[self._opponent]
+        return self._threat_value * (popcount(player_threats) - popcount(opponent_threats))
+
+    def _leaf_value(self, position):
+        """Returns the value of a leaf of _search: the one of _evaluate (plus
+        the threats), from the evaluator and the cache when it is there.
+        A position and its mirror image share the value."""
+        cache = self._eval_cache
+        if cache is not None:
+            key = position.canonical_key()[0]
+            value = cache.get(key)
+            if value is not None:
+                return value
+        if position.is_win(self._player):
+            value = WIN_VALUE
+        elif position.is_win(self._opponent):
+            value = -WIN_VALUE
+        elif position.is_full():
+            value = 0
+        else:
+            value = self._evaluator.score
+            if self._threat_value:
+                value += self._threat_score(position)
+        if cache is not None:
+            cache.store(key, value)
+        return value
+
+    def _threat_moves(self, position, depth, max_turn, table_move):
+        """Looks at the threats (empty cells that complete a line) of both
+        players before the moves of position are searched, at depth.
+        Returns (value, col, None, 0) when the threats decide the value: a
+        win at once, or (with depth 2 or more) two threats of the other
+        player or only moves under a threat. Otherwise returns (None, None,
+        moves, unsafe), the moves to search in order and the bitboard of the
+        cells under a threat of the other player, whose moves are skipped.
+        Cutting the moves keeps the minimax value: a move that lets the
+        other player win at once is a loss, that a search of depth 2 would
+        also find."""
+        piece = self._player if max_turn else self._opponent
+        other = self._opponent if max_turn else self._player
+        win_value = WIN_VALUE if max_turn else -WIN_VALUE
+        playable = position.playable_cells()
+        wins = position.winning_cells(piece) & playable
+        if wins:
+            return win_value, self._bit_columns[wins.bit_length() - 1], None, 0
+        forced = unsafe = 0
+        if depth >= 2:
+            threats = position.winning_cells(other)
+            forced = threats & playable
+            if forced & (forced - 1):
+                # two threats, only one can be blocked
+                return -win_value, self._bit_columns[forced.bit_length() - 1], None, 0
+            # moves under a threat, the other player would win on top
+            unsafe = (threats >> 1) & playable
+            if not forced and unsafe == playable:
+                return -win_value, self._bit_columns[unsafe.bit_length() - 1], None, 0
+        if forced:
+            # the only move that does not lose at once
+            return None, None, self._single_moves[self._bit_columns[forced.bit_length() - 1]], 0
+        return None, None, self._orderer.order(position, piece, table_move), unsafe
+
+    def _search(self, position, depth, max_turn, alpha, beta):
+        """Returns the score of the optimal column and the number of the column.
+        Works like _minimax but plays and undoes the moves in position
+        instead of copying the board, depth is the number of moves left.
+
+        Results are saved in the transposition table, so a position reached
+        again (in this or a later move) with enough depth is not searched.
+        The value of the leaves comes from the evaluator, that must be in
+        sync with position.
+        With pvs only the first move gets the (alpha, beta) window, the
+        next ones are searched with a null window that only tells if they
+        are better than the best move so far, and again with the window
+        when they are (the first move is the best one most of the times).
+        Raises SearchTimeout once the deadline of a timed search is over."""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes % CLOCK_CHECK_NODES == 0 and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+        if depth == 0:
+            return self._leaf_value(position), None
+        # same values as _evaluate, without checking the position twice
+        if position.is_win(self._player):
+            return WIN_VALUE, None
+        if position.is_win(self._opponent):
+            return -WIN_VALUE, None
+        if position.is_full():
+            return 0, None
+
+        alpha_orig = alpha
+        beta_orig = beta
+        # a position and its mirror image share the entry, the moves are
+        # stored for the position with the smaller key
+        key, mirrored = position.canonical_key()
+        if not max_turn:
+            key ^= MIN_TURN_KEY
+        entry = self._table.get(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, flag, value, table_move = entry
+            if mirrored and table_move is not None:
+                table_move = self._board_columns - 1 - table_move
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value, table_move
+                elif flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value, table_move
+
+        piece = self._player if max_turn else self._opponent
+        value, col, list_of_actions, unsafe = self._threat_moves(
+            position, depth, max_turn, table_move)
+        if value is not None:
+            return value, col
+
+        best_value = float('-inf') if max_turn else float('inf')
+        action_target = None
+        # the first move searched, the first ones can be skipped as unsafe
+        first = True
+
+        if max_turn:
+            for action in list_of_actions:
+                if unsafe >> position.heights[action] & 1:
+                    continue
+                self._evaluator.play(position.heights[action], piece)
+                position.play(action, piece)
+                if self._pvs and action_target is not None:
+                    # null window: can the move be better than alpha?
+                    value_child, col_child = self._search(
+                        position, depth-1, not max_turn, alpha, alpha + 1)
+                    if alpha < value_child < beta:
+                        value_child, col_child = self._search(
+                            position, depth-1, not max_turn, value_child, beta)
+                else:
+                    value_child, col_child = self._search(
+                        position, depth-1, not max_turn, alpha, beta)
+                position.undo()
+                self._evaluator.undo(position.heights[action], piece)
+
+                if best_value < value_child:
+                    best_value = value_child
+                    action_target = action
+                    alpha = max(alpha, best_value)
+                    if beta <= alpha:
+                        self._orderer.cutoff(position, piece, action, depth)
+                        if self._stats is not None:
+                            self._stats.cutoff(first)
+                        break
+                first = False
+
+        else:
+            for action in list_of_actions:
+                if unsafe >> position.heights[action] & 1:
+                    continue
+                self._evaluator.play(position.heights[action], piece)
+                position.play(action, piece)
+                if self._pvs and action_target is not None:
+                    # null window: can the move be worse than beta?
+                    value_child, col_child = self._search(
+                        position, depth-1, not max_turn, beta - 1, beta)
+                    if alpha < value_child < beta:
+                        value_child, col_child = self._search(
+                            position, depth-1, not max_turn, alpha, value_child)
+                else:
+                    value_child, col_child = self._search(
+                        position, depth-1, not max_turn, alpha, beta)
+                position.undo()
+                self._evaluator.undo(position.heights[action], piece)
+
+                if best_value > value_child:
+                    best_value = value_child
+                    action_target = action
+                    beta = min(beta, best_value)
+                    if beta <= alpha:
+                        self._orderer.cutoff(position, piece, action, depth)
+                        if self._stats is not None:
+                            self._stats.cutoff(first)
+                        break
+                first = False
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._store(key, mirrored, depth, flag, best_value, action_target)
+
+        return best_value, action_target
+
+
+class Solver:
+    """Perfect play solver: finds the exact result of a position.
+
+    Scores are from the point of view of the player to move:
+        * 0 -> draw with perfect play
+        * positive -> the player to move wins, the sooner the higher the score:
+            (cells + 1 - pieces in the board before the winning move) // 2
+        * negative -> the player to move loses, with the same rule for the opponent
+
+    The search is a negamax with alpha-beta on a bitboard Position, where
+    the score is found with null window searches (is the score above x?)
+    that move x like a binary search (MTD style). It only tries the moves
+    that do not give the opponent a win on the next move, the ones that
+    create more threats first, and keeps bounds in a TranspositionTable.
+
+    It has the next instances variables:
+        * nodes -> number of nodes searched since the solver was created
+
+    It has the next public methods:
+        * solve(position, piece) -> returns the score of position for piece to move
+        * best_move(position, piece) -> returns (column, score) of the best move
+    """
+
+    def __init__(self, rows, columns, table_mb=16):
+        """Create a solver for boards of rows and columns."""
+        self._columns = columns
+        self._cells = rows * columns
+        self._table = TranspositionTable(table_mb)
+        center = columns//2
+        self._order = sorted(range(columns), key=lambda c: abs(c - center))
+        self._column_masks = Position(rows, columns).column_mask
+        self._nodes = 0
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    def solve(self, position, piece):
+        """Returns the exact score of position for piece, that is the one to move."""
+        if position.winning_cells(piece) & position.playable_cells():
+            return (self._cells + 1 - position.count) // 2
+        low = -((self._cells - position.count) // 2)
+        high = (self._cells + 1 - position.count) // 2
+        while low < high:
+            # null window search around the middle, first near 0
+            middle = low + (high - low) // 2
+            if middle <= 0 and int(low / 2) < middle:
+                middle = int(low / 2)
+            elif middle >= 0 and int(high / 2) > middle:
+                middle = int(high / 2)
+            score = self._negamax(position, piece, middle, middle + 1)
+            if score <= middle:
+                high = score
+            else:
+                low = score
+        return low
+
+    def best_move(self, position, piece):
+        """Returns the column with the best score for piece and the score."""
+        winning = position.winning_cells(piece) & position.playable_cells()
+        best_col = None
+        best_score = None
+        for col in self._order:
+            if not position.can_play(col):
+                continue
+            if winning & self._column_masks(col):
+                return col, (self._cells + 1 - position.count) // 2
+            position.play(col, piece)
+            score = -self.solve(position, 3 - piece)
+            position.undo()
+            if best_score is None or score > best_score:
+                best_col = col
+                best_score = score
+        return best_col, best_score
+
+    def _negamax(self, position, piece, alpha, beta):
+        """Returns the score of position for piece inside (alpha, beta), or
+        a bound outside it. piece can not win with its next move."""
+        self._nodes += 1
+        opponent = 3 - piece
+        count = position.count
+        possible = position.playable_cells()
+        opponent_win = position.winning_cells(opponent)
+        forced = possible & opponent_win
+        if forced:
+            # two threats of the opponent can not be blocked
+            if forced & (forced - 1):
+                return -((self._cells - count) // 2)
+            possible = forced
+        # do not play under a cell where the opponent wins
+        non_losing = possible & ~(opponent_win >> 1)
+        if not non_losing:
+            return -((self._cells - count) // 2)
+        if count >= self._cells - 2:
+            return 0
+
+        min_score = -((self._cells - 2 - count) // 2)
+        max_score = (self._cells - 1 - count) // 2
+        # mirror images have the same score
+        key = position.canonical_key()[0]
+        if piece == 2:
+            key ^= MIN_TURN_KEY
+        entry = self._table.get(key)
+        if entry is not None:
+            if entry[1] == UPPER:
+                max_score = min(max_score, entry[2])
+            else:
+                min_score = max(min_score, entry[2])
+        alpha = max(alpha, min_score)
+        beta = min(beta, max_score)
+        if alpha >= beta:
+            return alpha
+
+        # moves that leave more cells to win first, center first on ties
+        moves = []
+        for col in self._order:
+            if non_losing & self._column_masks(col):
+                position.play(col, piece)
+                moves.append((-popcount(position.winning_cells(piece)), len(moves), col))
+                position.undo()
+        moves.sort()
+
+        for _, _, col in moves:
+            position.play(col, piece)
+            score = -self._negamax(position, opponent, -beta, -alpha)
+            position.undo()
+            if score >= beta:
+                self._table.store(key, 0, LOWER, score, None)
+                return score
+            if score > alpha:
+                alpha = score
+        self._table.store(key, 0, UPPER, alpha, None)
+        return alpha
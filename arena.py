@@ -0,0 +1,225 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from bitboard import Position
+
+# Minimax_AI arguments that an engine can set, besides time_limit_ms
+ENGINE_OPTIONS = ('depth', 'table_mb', 'seed', 'book', 'solver_cells', 'threat_value',
+                  'eval_cache_mb', 'pvs', 'aspiration_window')
+
+
+def parse_value(text):
+    """Returns text as an int, a float, None ('none') or the text itself."""
+    if text.lower() == 'none':
+        return None
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_engine(spec):
+    """Returns (name, options) from a spec 'name:option=value,option=value'.
+    The options are Minimax_AI arguments (ENGINE_OPTIONS) and
+    time_limit_ms, the time of every move."""
+    name, _, options_text = spec.partition(':')
+    options = {}
+    for option in filter(None, options_text.split(',')):
+        key, _, value = option.partition('=')
+        if key not in ENGINE_OPTIONS + ('time_limit_ms',):
+            raise ValueError('unknown engine option %r in %r' % (key, spec))
+        options[key] = parse_value(value)
+    return name, options
+
+
+def random_opening(rng, rows, columns, plies, connect=4):
+    """Returns a string with plies random columns that do not end the game."""
+    while True:
+        position = Position(rows, columns, connect)
+        moves = ''
+        for ply in range(plies):
+            piece = 1 + ply % 2
+            col = rng.choice(position.actions())
+            position.play(col, piece)
+            moves += str(col)
+            if position.is_win(piece):
+                break
+        else:
+            return moves
+
+
+def play_game(engines, opening, rows, columns, connect=4):
+    """Plays a game between engines, a list with the (name, options) of
+    player 1 and player 2, after the columns of opening.
+    Returns a dict with the moves and, for every AI move, its time in
+    milliseconds and its nodes, and the result for player 1 (1, 0.5 or 0)."""
+    from ai import Minimax_AI
+    ais = []
+    time_limits = []
+    for player, (name, options) in enumerate(engines, 1):
+        options = dict(options)
+        time_limits.append(options.pop('time_limit_ms', None))
+        options.setdefault('depth', 4)
+        depth = options.pop('depth')
+        ais.append(Minimax_AI(depth, player, rows, columns, connect=connect, **options))
+
+    position = Position(rows, columns, connect)
+    moves = ''
+    times_ms = []
+    nodes = []
+    result = 0.5
+    for turn in range(rows * columns):
+        piece = 1 + turn % 2
+        if turn < len(opening):
+            col = int(opening[turn])
+        else:
+            ai = ais[piece - 1]
+            start = time.perf_counter()
+            col = ai.make_move(np.array(position.to_status()), time_limits[piece - 1])
+            times_ms.append((time.perf_counter() - start) * 1000)
+            nodes.append(ai.nodes)
+        position.play(col, piece)
+        moves += str(col)
+        if position.is_win(piece):
+            result = 1 if piece == 1 else 0
+            break
+    for ai in ais:
+        ai.close()
+    return {
+        'first': engines[0][0],
+        'second': engines[1][0],
+        'opening': opening,
+        'moves': moves,
+        'times_ms': times_ms,
+        'nodes': nodes,
+        'result': result,
+    }
+
+
+def schedule(engines, games, rows, columns, connect, plies, seed):
+    """Returns the list of (engines, opening) to play: every opening is
+    played by every pair of engines with both colors."""
+    rng = random.Random(seed)
+    matches = []
+    for _ in range(games):
+        opening = random_opening(rng, rows, columns, plies, connect)
+        for first, second in itertools.combinations(engines, 2):
+            matches.append(([first, second], opening))
+            matches.append(([second, first], opening))
+    return matches
+
+
+def read_results(path):
+    """Returns the games saved in the results file, skipping a last line
+    cut by a crash."""
+    games = []
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                try:
+                    games.append(json.loads(line))
+                except ValueError:
+                    pass
+    return games
+
+
+def elo_ratings(games, iterations=500):
+    """Returns a dict name -> Elo rating that best explains the results of
+    games, with a mean of 0.
+    Every engine also gets one draw against a virtual engine rated 0, so
+    an engine that won every game still gets a finite rating."""
+    scores = {}
+    opponents = {}
+    for game in games:
+        first, second = game['first'], game['second']
+        scores[first] = scores.get(first, 0.5) + game['result']
+        scores[second] = scores.get(second, 0.5) + 1 - game['result']
+        opponents.setdefault(first, []).append(second)
+        opponents.setdefault(second, []).append(first)
+
+    def expected(rating, other):
+        return 1 / (1 + 10 ** ((other - rating) / 400))
+
+    ratings = dict.fromkeys(scores, 0.0)
+    for _ in range(iterations):
+        for name in ratings:
+            total = expected(ratings[name], 0.0) + sum(
+                expected(ratings[name], ratings[other]) for other in opponents[name])
+            games_played = len(opponents[name]) + 1
+            # step of a logistic fit, the slope of expected is at most ln10/1600
+            ratings[name] += (scores[name] - total) * 1600 / math.log(10) / games_played
+    mean = sum(ratings.values()) / len(ratings) if ratings else 0
+    return {name: rating - mean for name, rating in ratings.items()}
+
+
+def print_ratings(games):
+    """Prints the games, score, time per move and Elo of every engine."""
+    ratings = elo_ratings(games)
+    stats = {name: [0, 0.0, 0.0, 0] for name in ratings}
+    for game in games:
+        for name, score, parity in ((game['first'], game['result'], 0),
+                                    (game['second'], 1 - game['result'], 1)):
+            stats[name][0] += 1
+            stats[name][1] += score
+            # the moves of an engine are every other AI move of the game
+            offset = (len(game['opening']) + parity) % 2
+            times = game['times_ms'][offset::2]
+            stats[name][2] += sum(times)
+            stats[name][3] += len(times)
+    print('%-12s %6s %7s %10s %7s' % ('engine', 'games', 'score', 'ms/move', 'elo'))
+    for name in sorted(ratings, key=ratings.get, reverse=True):
+        played, score, milliseconds, moves = stats[name]
+        print('%-12s %6d %6.1f%% %10.1f %+7.0f' % (
+            name, played, 100 * score / played, milliseconds / max(moves, 1), ratings[name]))
+
+
+def run(args):
+    """Plays the games of args.engine in a pool of processes, appending
+    every game to args.output as one line of JSON as soon as it ends,
+    and prints the ratings of all the games in args.output."""
+    engines = [parse_engine(spec) for spec in args.engine]
+    if len({name for name, options in engines}) != len(engines):
+        raise ValueError('every engine needs a different name')
+    matches = schedule(engines, args.games, args.rows, args.columns, args.connect,
+                       args.opening_plies, args.seed)
+    print('%d games on %d processes' % (len(matches), args.workers))
+    with open(args.output, 'a') as output:
+        with ProcessPoolExecutor(args.workers) as executor:
+            futures = [executor.submit(play_game, match, opening, args.rows, args.columns,
+                                       args.connect)
+                       for match, opening in matches]
+            for count, future in enumerate(as_completed(futures), 1):
+                output.write(json.dumps(future.result()) + '\n')
+                output.flush()
+                if count % 10 == 0:
+                    print('%d/%d' % (count, len(matches)))
+    print_ratings(read_results(args.output))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Plays games between AI engines without a window and rates them. '
+        'Example: python arena.py --engine d4:depth=4 --engine t50:time_limit_ms=50')
+    parser.add_argument('--engine', action='append', required=True,
+                        help="name:option=value,... with the options %s and time_limit_ms"
+                        % ', '.join(ENGINE_OPTIONS))
+    parser.add_argument('--games', type=int, default=10,
+                        help='openings played by every pair of engines with both colors')
+    parser.add_argument('--opening-plies', type=int, default=2,
+                        help='random moves before the engines play')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='arena.jsonl',
+                        help='file where the games are appended')
+    run(parser.parse_args())
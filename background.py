@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+
+
+class BackgroundMove:
+    """Minimax_AI.make_move running in a worker thread.
+
+    The thread that creates it (the pygame loop) keeps running: it asks
+    done at every frame, shows progress while the AI thinks and takes
+    result at the end. cancel stops the search, for example when the
+    window is closed.
+
+    The AI must not be used by other threads until the move is done.
+
+    It has the next instances variables:
+        * done -> True when the move is found (or cancelled)
+        * progress -> (completed depth, depth being searched, nodes) of the AI
+        * result -> column chosen, None if cancelled
+
+    It has the next public methods:
+        * .cancel() -> stops the search and waits for the thread
+    """
+
+    def __init__(self, ai, board, time_limit_ms=None):
+        """Starts ai.make_move for a copy of board."""
+        self._ai = ai
+        # before the thread starts, so a cancel right after is never lost
+        ai.clear_cancel()
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(np.array(board), time_limit_ms), daemon=True)
+        self._thread.start()
+
+    def _run(self, board, time_limit_ms):
+        try:
+            self._result = self._ai.make_move(board, time_limit_ms)
+        except Exception as error:
+            self._error = error
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+    @property
+    def progress(self):
+        return self._ai.progress
+
+    @property
+    def result(self):
+        """Column chosen by the AI, waits for the end of the search.
+        Raises the exception of make_move if there was one."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """Stops the search and waits for the thread to end."""
+        self._ai.cancel()
+        self._thread.join()
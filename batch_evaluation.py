@@ -0,0 +1,85 @@
+import numpy as np
+from tables import EvaluationTables
+from evaluation import (WIN_VALUE, CENTER_PIECES_VALUE, TWO_PIECES_VALUE,
+                        THREE_PIECES_VALUE)
+
+# number of boards scored at once, bounds the memory of the window arrays
+CHUNK_SIZE = 65536
+
+
+def window_cells(rows, columns, connect=4):
+    """Returns an array (windows, connect) with the cells of every line of
+    connect cells. Cells are indexes of the board flattened by rows, row 0
+    is the bottom."""
+    tables = EvaluationTables.get(rows, columns, connect)
+    return np.array(tables.line_cells, dtype=np.intp).reshape(-1, connect)
+
+
+def bitboards_to_boards(bitboards, rows, columns):
+    """Returns an array (N, rows, columns) of pieces from an array (N, 2) of
+    Position bitboards of player 1 and player 2."""
+    stride = rows + 1
+    if columns * stride > 64:
+        raise ValueError('a %dx%d bitboard does not fit in 64 bits' % (rows, columns))
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    bits = np.array([[c * stride + r for c in range(columns)] for r in range(rows)],
+                    dtype=np.uint64)
+    boards = np.zeros((len(bitboards), rows, columns), dtype=np.int8)
+    for piece in (1, 2):
+        cells = (bitboards[:, piece - 1, None, None] >> bits) & np.uint64(1)
+        boards[cells.astype(bool)] = piece
+    return boards
+
+
+def evaluate_batch(boards, player, connect=4):
+    """Scores N boards at once with the values of Minimax_AI._utility.
+
+    boards is an array (N, rows, columns) with 0, 1 and 2 like Board.status.
+    Returns three arrays of length N:
+        * win -> True where player has connect in a row
+        * loss -> True where the opponent has connect in a row
+        * score -> value of the board for player (WIN_VALUE for a win,
+            -WIN_VALUE for a loss, 0 for a tie)
+    """
+    boards = np.asarray(boards)
+    count, rows, columns = boards.shape
+    opponent = 2 if player == 1 else 1
+    windows = window_cells(rows, columns, connect)
+    flat = boards.reshape(count, rows * columns)
+    win = np.zeros(count, dtype=bool)
+    loss = np.zeros(count, dtype=bool)
+    score = np.zeros(count, dtype=np.int64)
+
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = flat[start:start + CHUNK_SIZE]
+        cells = chunk[:, windows]
+        player_pieces = (cells == player).sum(axis=2)
+        opponent_pieces = (cells == opponent).sum(axis=2)
+
+        player_only = opponent_pieces == 0
+        opponent_only = player_pieces == 0
+        values = (THREE_PIECES_VALUE * ((player_pieces == connect - 1) & player_only)
+                  + TWO_PIECES_VALUE * ((player_pieces == connect - 2) & player_only)
+                  - THREE_PIECES_VALUE * ((opponent_pieces == connect - 1) & opponent_only)
+                  - TWO_PIECES_VALUE * ((opponent_pieces == connect - 2) & opponent_only))
+        center = chunk.reshape(-1, rows, columns)[:, :, columns//2]
+        chunk_score = values.sum(axis=1) + CENTER_PIECES_VALUE * (
+            (center == player).sum(axis=1) - (center == opponent).sum(axis=1))
+
+        chunk_win = (player_pieces == connect).any(axis=1)
+        chunk_loss = (opponent_pieces == connect).any(axis=1)
+        full = (chunk != 0).all(axis=1)
+        chunk_score[full] = 0
+        chunk_score[chunk_loss] = -WIN_VALUE
+        chunk_score[chunk_win] = WIN_VALUE
+
+        end = start + len(chunk)
+        win[start:end] = chunk_win
+        loss[start:end] = chunk_loss
+        score[start:end] = chunk_score
+    return win, loss, score
+
+
+def evaluate_bitboards(bitboards, rows, columns, player, connect=4):
+    """Same as evaluate_batch for an array (N, 2) of Position bitboards."""
+    return evaluate_batch(bitboards_to_boards(bitboards, rows, columns), player, connect)
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from ai import Minimax_AI
+from makefirst5moves import position_of
+
+ROWS = 6
+COLUMNS = 7
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(PACKAGE_DIR, 'benchmark_positions.txt')
+# measures of time, that change with the machine and from run to run
+TIMES = ('seconds', 'utility_us', 'is_endgame_us')
+
+
+def load_corpus(path):
+    """Returns a list of (category, moves) from the corpus file. moves is a
+    string with the columns played from the empty board."""
+    corpus = []
+    with open(path) as file:
+        for line in file:
+            line = line.split('#')[0].split()
+            if line:
+                category, moves = line
+                corpus.append((category, moves.strip('-')))
+    return corpus
+
+
+def measure_position(moves, depth, runs, calls):
+    """Measures the search and the evaluation of the position after moves.
+    Every time is the best of runs, the search starts with an empty
+    transposition table every run."""
+    board = np.array(position_of(moves, ROWS, COLUMNS).to_status())
+    player = 1 + len(moves) % 2
+    seconds = float('inf')
+    for _ in range(runs):
+        ai = Minimax_AI(depth, player, ROWS, COLUMNS, book=None, solver_cells=0)
+        start = time.perf_counter()
+        ai.make_move(board)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    def per_call(function):
+        best = float('inf')
+        for _ in range(runs):
+            start = time.perf_counter()
+            for _ in range(calls):
+                function(board)
+            best = min(best, time.perf_counter() - start)
+        return best / calls * 1e6
+
+    return {
+        'nodes': ai.nodes,
+        'seconds': seconds,
+        'nps': ai.nodes / seconds,
+        'utility_us': per_call(ai._utility),
+        'is_endgame_us': per_call(lambda board: ai._is_endgame(board, player)),
+    }
+
+
+def run(corpus, depth, runs=5, calls=200):
+    """Returns a dict moves -> measures of every position of corpus."""
+    results = {}
+    for category, moves in corpus:
+        result = measure_position(moves, depth, runs, calls)
+        result['category'] = category
+        results[moves or '-'] = result
+        print('%-10s %-26s nodes %8d  time %7.3fs  nps %7.0f  _utility %6.1fus  _is_endgame %5.1fus'
+              % (category, moves or '-', result['nodes'], result['seconds'], result['nps'],
+                 result['utility_us'], result['is_endgame_us']))
+    return results
+
+
+def category_totals(results):
+    """Returns a dict category -> sum of every measure of its positions."""
+    totals = {}
+    for result in results.values():
+        total = totals.setdefault(result['category'], dict.fromkeys(TIMES, 0.0))
+        for measure in TIMES:
+            total[measure] += result[measure]
+    return totals
+
+
+def compare(results, baseline, time_threshold, nodes_threshold):
+    """Returns a list with a message for every measure of results that is
+    worse than the one of baseline by more than its threshold (a fraction,
+    0.25 is 25% worse).
+    The nodes are compared position by position, they do not depend on the
+    machine. The times are compared by category, the sum of the times of
+    many positions changes less from run to run than the time of one."""
+    regressions = []
+
+    def check(name, measure, old, new, threshold):
+        if new > old * (1 + threshold):
+            regressions.append('%s: %s %.4g -> %.4g (+%.0f%%)' % (
+                name, measure, old, new, (new / old - 1) * 100))
+
+    for moves, result in results.items():
+        if moves in baseline:
+            check('%s %s' % (result['category'], moves), 'nodes',
+                  baseline[moves]['nodes'], result['nodes'], nodes_threshold)
+    # only the positions measured in both, so the sums are comparable
+    old_totals = category_totals({moves: old for moves, old in baseline.items()
+                                  if moves in results})
+    new_totals = category_totals({moves: result for moves, result in results.items()
+                                  if moves in baseline})
+    for category, total in new_totals.items():
+        for measure in TIMES:
+            if category in old_totals:
+                check(category, measure, old_totals[category][measure], total[measure],
+                      time_threshold)
+    return regressions
+
+
+def main(args):
+    corpus = load_corpus(args.corpus)
+    results = run(corpus, args.depth, args.runs, args.calls)
+    total_nodes = sum(result['nodes'] for result in results.values())
+    total_seconds = sum(result['seconds'] for result in results.values())
+    print('total nodes %d  time %.3fs  nps %.0f' % (total_nodes, total_seconds,
+                                                    total_nodes / total_seconds))
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({'depth': args.depth, 'positions': results}, file, indent=1)
+        print('baseline saved to %s' % args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print('no baseline in %s, run with --save to create it' % args.baseline)
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline['depth'] != args.depth:
+        print('the baseline was measured with depth %d' % baseline['depth'])
+        return 2
+    regressions = compare(results, baseline['positions'], args.time_threshold,
+                          args.nodes_threshold)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    if not regressions:
+        print('no regressions against %s' % args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Measures the search and the evaluation on a corpus of positions '
+        'and compares them with a saved baseline')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--baseline', default='benchmark_baseline.json')
+    parser.add_argument('--depth', type=int, default=9)
+    parser.add_argument('--runs', type=int, default=5,
+                        help='times measured, the best one is kept')
+    parser.add_argument('--calls', type=int, default=200,
+                        help='calls of _utility and _is_endgame per run')
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                        help='allowed fraction of extra time, 0.25 is 25%% slower')
+    parser.add_argument('--nodes-threshold', type=float, default=0.0,
+                        help='allowed fraction of extra nodes, the count is deterministic')
+    parser.add_argument('--save', action='store_true',
+                        help='save the results as the new baseline')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,261 @@
+import random
+from tables import EvaluationTables
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # python < 3.10
+    def popcount(bitboard):
+        return bin(bitboard).count('1')
+
+
+class Position:
+    """Bitboard representation of a connect4 position (or connect-N, see
+    connect).
+
+    Every column of the board uses rows+1 bits: one bit per cell, from the
+    bottom to the top, plus an always empty sentinel bit. The sentinel keeps
+    shifted lines from wrapping around from one column to the next.
+
+    It has the next instances variables:
+        * rows -> number of rows in the board
+        * columns -> number of columns in the board
+        * connect -> number of pieces in a row that win
+        * tables -> EvaluationTables of rows, columns and connect
+        * bitboards -> list with the cells of each piece (index 1 and 2)
+        * mask -> bitboard with all the occupied cells
+        * heights -> list with the next free bit of every column
+        * count -> number of pieces in the board
+        * key -> Zobrist hash of the position, updated on every play/undo
+        * mirror_key -> Zobrist hash of the position mirrored left to right
+
+    It has the next public methods:
+        * Position.from_status(board_status, rows, columns, connect) -> new position
+        * .to_status() -> returns the board as a list of rows
+        * .can_play(col) -> returns True if there is space in col
+        * .actions() -> returns a list with the columns that have space
+        * .play(col, piece) -> drops a piece in col
+        * .undo() -> takes back the last piece played
+        * .is_win(piece) -> returns True if piece has connect in a row
+        * .is_full() -> returns True if there is no space left
+        * .canonical_key() -> returns the same key for a position and its mirror
+        * .column_mask(col) -> returns the bitboard of all the cells in col
+        * .playable_cells() -> returns the bitboard of the cells where a piece can drop
+        * .winning_cells(piece) -> returns the bitboard of the empty cells that
+            would give connect in a row to piece
+        * .window_masks() -> returns the bitboards of every line of connect cells
+    """
+
+    _zobrist = {}
+
+    def __init__(self, rows, columns, connect=4):
+        """Create an empty position with rows and columns."""
+        self._rows = rows
+        self._columns = columns
+        self._connect = connect
+        self._tables = EvaluationTables.get(rows, columns, connect)
+        self._stride = rows + 1
+        self._bitboards = [0, 0, 0]
+        self._mask = 0
+        self._heights = [c * self._stride for c in range(columns)]
+        self._history = []
+        self._bottom_mask = 0
+        for c in range(columns):
+            self._bottom_mask |= 1 << (c * self._stride)
+        self._board_mask = self._bottom_mask * ((1 << rows) - 1)
+        self._key = 0
+        self._mirror_key = 0
+        self._zobrist_keys = self._zobrist_table()
+
+    @classmethod
+    def from_status(cls, board_status, rows, columns, connect=4):
+        """Returns a position with the pieces of a board matrix.
+        Row 0 of board_status is the bottom of the board."""
+        position = cls(rows, columns, connect)
+        for c in range(columns):
+            for r in range(rows):
+                piece = int(board_status[r][c])
+                if piece == 0:
+                    break
+                position.play(c, piece)
+        return position
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def __getstate__(self):
+        # the tables are shared, a process gets its own with EvaluationTables.get
+        state = self.__dict__.copy()
+        del state['_tables']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tables = EvaluationTables.get(self._rows, self._columns, self._connect)
+
+    @property
+    def connect(self):
+        return self._connect
+
+    @property
+    def tables(self):
+        return self._tables
+
+    @property
+    def bitboards(self):
+        return self._bitboards
+
+    @property
+    def mask(self):
+        return self._mask
+
+    @property
+    def heights(self):
+        return self._heights
+
+    @property
+    def count(self):
+        return len(self._history)
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def mirror_key(self):
+        return self._mirror_key
+
+    def to_status(self):
+        """Returns the board as a list of rows, row 0 is the bottom."""
+        status = [[0] * self._columns for _ in range(self._rows)]
+        for c in range(self._columns):
+            for r in range(self._rows):
+                bit = 1 << (c * self._stride + r)
+                if self._bitboards[1] & bit:
+                    status[r][c] = 1
+                elif self._bitboards[2] & bit:
+                    status[r][c] = 2
+        return status
+
+    def can_play(self, col):
+        """Returns True if there is space for a new piece in col."""
+        return self._heights[col] < col * self._stride + self._rows
+
+    def actions(self):
+        """Returns a list with the columns that have space for a new piece."""
+        return [c for c in range(self._columns) if self.can_play(c)]
+
+    def play(self, col, piece):
+        """Drops piece in col. The column must have space."""
+        bit = 1 << self._heights[col]
+        self._bitboards[piece] |= bit
+        self._mask |= bit
+        self._key ^= self._zobrist_keys[piece][self._heights[col]]
+        self._mirror_key ^= self._zobrist_keys[piece][self._mirror_cell(col)]
+        self._heights[col] += 1
+        self._history.append(col)
+
+    def undo(self):
+        """Takes back the last piece played."""
+        col = self._history.pop()
+        self._heights[col] -= 1
+        bit = 1 << self._heights[col]
+        piece = 1 if self._bitboards[1] & bit else 2
+        self._bitboards[piece] ^= bit
+        self._mask ^= bit
+        self._key ^= self._zobrist_keys[piece][self._heights[col]]
+        self._mirror_key ^= self._zobrist_keys[piece][self._mirror_cell(col)]
+
+    def canonical_key(self):
+        """Returns the smaller of key and mirror_key, so a position and its
+        mirror image share the key, and True if it is mirror_key."""
+        if self._mirror_key < self._key:
+            return self._mirror_key, True
+        return self._key, False
+
+    def _mirror_cell(self, col):
+        """Returns the bit of the cell heights[col] mirrored left to right."""
+        return self._heights[col] + (self._columns - 1 - 2 * col) * self._stride
+
+    def is_win(self, piece):
+        """Returns True if piece has connect in a row in this position."""
+        bitboard = self._bitboards[piece]
+        connect = self._connect
+        for shift in self._tables.shifts:
+            # cells that start a run of length pieces, doubling the length
+            run = bitboard
+            length = 1
+            while 2 * length <= connect:
+                run &= run >> (length * shift)
+                length *= 2
+            if length < connect:
+                run &= run >> ((connect - length) * shift)
+            if run:
+                return True
+        return False
+
+    def is_full(self):
+        """Returns True if there is no space left in the board."""
+        return len(self._history) == self._rows * self._columns
+
+    def playable_cells(self):
+        """Returns the bitboard of the cells where the next piece of every
+        column would drop."""
+        return (self._mask + self._bottom_mask) & self._board_mask
+
+    def winning_cells(self, piece):
+        """Returns the bitboard of the empty cells (playable now or not) that
+        would complete connect in a row for piece."""
+        bitboard = self._bitboards[piece]
+        if self._connect != 4:
+            return self._winning_cells_any(bitboard)
+        stride = self._stride
+        # vertical: only three pieces below the cell
+        cells = (bitboard << 1) & (bitboard << 2) & (bitboard << 3)
+        # horizontal and both diagonals: the cell can be any of the four
+        for shift in (stride, stride - 1, stride + 1):
+            pair = (bitboard << shift) & (bitboard << 2 * shift)
+            cells |= pair & (bitboard << 3 * shift)
+            cells |= pair & (bitboard >> shift)
+            pair = (bitboard >> shift) & (bitboard >> 2 * shift)
+            cells |= pair & (bitboard << shift)
+            cells |= pair & (bitboard >> 3 * shift)
+        return cells & (self._board_mask ^ self._mask)
+
+    def _winning_cells_any(self, bitboard):
+        """winning_cells for any connect: the cell can be any of the line."""
+        cells = 0
+        for shift in self._tables.shifts:
+            for gap in range(self._connect):
+                run = -1
+                for index in range(self._connect):
+                    offset = (index - gap) * shift
+                    if offset > 0:
+                        run &= bitboard >> offset
+                    elif offset < 0:
+                        run &= bitboard << -offset
+                cells |= run
+        return cells & (self._board_mask ^ self._mask)
+
+    def column_mask(self, col):
+        """Returns the bitboard with all the cells of col."""
+        return ((1 << self._rows) - 1) << (col * self._stride)
+
+    def window_masks(self):
+        """Returns a list with the bitboard of every line of connect cells."""
+        return self._tables.line_masks
+
+    def _zobrist_table(self):
+        """Returns one random 64 bits number per piece and cell. The seed
+        is fixed so keys are the same in every process."""
+        shape = (self._rows, self._columns)
+        if shape not in Position._zobrist:
+            rng = random.Random('%dx%d' % shape)
+            bits = self._columns * self._stride
+            Position._zobrist[shape] = [
+                [rng.getrandbits(64) for _ in range(bits)] for _ in range(3)]
+        return Position._zobrist[shape]
@@ -1,4 +1,11 @@
 import numpy as np
+from bitboard import Position
+
+# pieces in a row that win
+CONNECT = 4
+# (row, col) steps of the four lines through a cell: horizontal, vertical
+# and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
 
 
 class Board:
@@ -7,12 +14,21 @@ class Board:
         * status -> a numpy matriz with current board status
         * rows -> number of rows in the board
         * columns -> number of columns in the board
+        * last_move -> (row, col, piece) of the last insert_piece, or None
+        * position -> bitboard Position kept in sync with status, or None
+            if the board was created with bitboard=False
 
         Once initialized rows and columns can't be changed but status
         can be set to any matriz -as long as the shape remains the same- 
         at any moment with the syntax:
             Board.status = matriz
 
+        The board remembers which players have four in a row. insert_piece
+        only looks at the four lines through the new piece, so
+        is_winning_position does not scan the whole board after every move.
+        status must only change through insert_piece or the syntax above,
+        a matriz changed in place is not seen by the board.
+
     It has the next public methods:
         * .print_status() -> prints the board
         * .insert_piece(row, col, piece) -> puts a piece in the board
@@ -21,12 +37,17 @@ class Board:
         * .get_next_open_row(col) -> Returns the available row for a new piece
     """
 
-    def __init__(self, ROW_COUNT, COLUMN_COUNT):
+    def __init__(self, ROW_COUNT, COLUMN_COUNT, bitboard=False):
         """initialize and empty board (a matriz of zeros).
-        Receives the number of rows and columns."""
+        Receives the number of rows and columns.
+        With bitboard the board also keeps a bitboard Position of status."""
         self._status = np.zeros((ROW_COUNT, COLUMN_COUNT))
         self._rows = ROW_COUNT
         self._columns = COLUMN_COUNT
+        self._last_move = None
+        # wins[player] is True if player has four in a row, None if unknown
+        self._wins = [None, False, False]
+        self._position = Position(ROW_COUNT, COLUMN_COUNT) if bitboard else None
 
     @property
     def status(self):
@@ -35,6 +56,10 @@ class Board:
     @status.setter
     def status(self, new_status):
         self._status = new_status
+        self._last_move = None
+        self._wins = [None, None, None]
+        if self._position is not None:
+            self._position = Position.from_status(new_status, self._rows, self._columns)
 
     @property
     def rows(self):
@@ -44,6 +69,14 @@ class Board:
     def columns(self):
         return self._columns
 
+    @property
+    def last_move(self):
+        return self._last_move
+
+    @property
+    def position(self):
+        return self._position
+
     def print_status(self):
         print(np.flip(self._status, 0))
 
@@ -60,10 +93,54 @@ class Board:
 
     def insert_piece(self, row, col, piece):
         """Sets a new piece in the board"""
+        replaced = self._status[row][col]
         self._status[row][col] = piece
+        self._last_move = (row, col, piece)
+        dropped = replaced == 0 and piece in (1, 2)
+        if self._position is not None:
+            if dropped and self._position.heights[col] == col * (self._rows + 1) + row:
+                self._position.play(col, piece)
+            else:
+                self._position = Position.from_status(self._status, self._rows, self._columns)
+
+        if not dropped:
+            # a piece was removed or replaced, the wins are found again when asked
+            self._wins = [None, None, None]
+        elif self._wins[piece] is False:
+            # only the lines through the new piece can give a new win
+            if self._position is not None:
+                self._wins[piece] = self._position.is_win(piece)
+            else:
+                self._wins[piece] = self._wins_at(row, col, piece)
+
+    def _wins_at(self, row, col, piece):
+        """Returns True if one of the four lines through (row, col) has four
+        pieces of piece in a row."""
+        status = self._status
+        for dr, dc in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r = row + sign * dr
+                c = col + sign * dc
+                while 0 <= r < self._rows and 0 <= c < self._columns and status[r][c] == piece:
+                    count += 1
+                    r += sign * dr
+                    c += sign * dc
+            if count >= CONNECT:
+                return True
+        return False
 
     def is_winning_position(self, player):
         """Returns True if player wins in this board position"""
+        if self._wins[player] is None:
+            if self._position is not None:
+                self._wins[player] = self._position.is_win(player)
+            else:
+                self._wins[player] = bool(self._scan_win(player))
+        return self._wins[player]
+
+    def _scan_win(self, player):
+        """Looks for four in a row of player in the whole board."""
         # Check horizontal locations for win
         for c in range(self._columns-3):
             for r in range(self._rows):
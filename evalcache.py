@@ -0,0 +1,73 @@
+from array import array
+
+
+class EvaluationCache:
+    """Fixed size cache of the static values of positions (the leaves of
+    the search) keyed by the Zobrist key of the position.
+
+    The slots are grouped in sets of two (2-way set associative): a key can
+    only be in the two slots of its set. A new value goes to the first slot
+    and moves the one there to the second, so a set keeps the two most
+    recent positions that fall in it.
+
+    Keys and values are kept in two preallocated arrays of machine
+    integers, about 12 bytes per slot. Slots are empty with key 0, the key
+    of the empty board, whose value is 0 anyway.
+
+    It has the next instances variables:
+        * size -> number of slots in the cache
+        * probes -> number of lookups
+        * hits -> number of lookups that found the position
+        * hit_rate -> hits / probes
+
+    It has the next public methods:
+        * .get(key) -> returns the value stored for key or None
+        * .store(key, value) -> saves the value of key
+        * .clear() -> removes all the values
+    """
+
+    # bytes of one slot: an unsigned 64 bits key and a 32 bits value
+    ENTRY_BYTES = 12
+
+    def __init__(self, memory_mb=4):
+        """Create an empty cache that uses about memory_mb megabytes."""
+        self._sets = max(1, int(memory_mb * 1024 * 1024) // (2 * self.ENTRY_BYTES))
+        self.clear()
+
+    @property
+    def size(self):
+        return 2 * self._sets
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def get(self, key):
+        """Returns the value stored for key or None."""
+        self.probes += 1
+        index = 2 * (key % self._sets)
+        keys = self._keys
+        if keys[index] == key:
+            self.hits += 1
+            return self._values[index]
+        if keys[index + 1] == key:
+            self.hits += 1
+            return self._values[index + 1]
+        return None
+
+    def store(self, key, value):
+        """Saves the value of key in the first slot of its set."""
+        index = 2 * (key % self._sets)
+        keys = self._keys
+        values = self._values
+        keys[index + 1] = keys[index]
+        values[index + 1] = values[index]
+        keys[index] = key
+        values[index] = value
+
+    def clear(self):
+        """Removes all the values."""
+        self._keys = array('Q', bytes(8 * self.size))
+        self._values = array('i', bytes(4 * self.size))
+        self.probes = 0
+        self.hits = 0
@@ -0,0 +1,117 @@
+from tables import EvaluationTables
+
+# values used to score a board position
+WIN_VALUE = 1000
+CENTER_PIECES_VALUE = 3
+TWO_PIECES_VALUE = 2
+THREE_PIECES_VALUE = 5
+# value of a threat in a row of the right parity (see Minimax_AI threat_value)
+THREAT_VALUE = 4
+
+
+def window_value(player_pieces, opponent_pieces, connect=4):
+    """Returns the value of a line of connect cells for the player: one or
+    two pieces short of a win, with no pieces of the other player."""
+    pieces_values = {connect - 2: TWO_PIECES_VALUE, connect - 1: THREE_PIECES_VALUE}
+    if opponent_pieces == 0:
+        return pieces_values.get(player_pieces, 0)
+    if player_pieces == 0:
+        return -pieces_values.get(opponent_pieces, 0)
+    return 0
+
+
+class IncrementalEvaluator:
+    """Heuristic value of a position for player, updated move by move.
+
+    The value is the one of Minimax_AI._utility for a non final position:
+    the pieces in the center column plus the value of every line of connect
+    cells (window) one or two pieces short of a win, with pieces of only one
+    player. The windows come from the EvaluationTables of the board.
+
+    The evaluator keeps how many pieces of each player there are in every
+    window. Dropping a piece only changes the windows that go through its
+    cell (at most 16 in a 6x7 connect4 board), so play and undo update the value
+    without looking at the rest of the board.
+
+    It has the next instances variables:
+        * score -> value of the current position for player
+
+    It has the next public methods:
+        * .reset(position) -> sets the evaluator to the pieces of position
+        * .play(cell, piece) -> adds piece in cell (a bit of the Position)
+        * .undo(cell, piece) -> removes piece from cell
+    """
+
+    def __init__(self, rows, columns, player, connect=4):
+        """Create an evaluator of boards of rows and columns for player."""
+        tables = EvaluationTables.get(rows, columns, connect)
+        windows = tables.lines
+        cells = columns * tables.stride
+        self._player = player
+        self._cell_windows = tables.cell_lines
+
+        center_mask = tables.center_mask
+        self._center = [[0] * cells for _ in range(3)]
+        for cell in range(cells):
+            if center_mask >> cell & 1:
+                self._center[player][cell] = CENTER_PIECES_VALUE
+                self._center[3 - player][cell] = -CENTER_PIECES_VALUE
+
+        # change of value when a piece is added to a window with own
+        # pieces of its player and other pieces of the other player
+        self._delta = [None, None, None]
+        for piece in (1, 2):
+            delta = [[0] * (connect + 1) for _ in range(connect + 1)]
+            for own in range(connect):
+                for other in range(connect - own):
+                    if piece == player:
+                        delta[own][other] = window_value(
+                            own + 1, other, connect) - window_value(own, other, connect)
+                    else:
+                        delta[own][other] = window_value(
+                            other, own + 1, connect) - window_value(other, own, connect)
+            self._delta[piece] = delta
+
+        self._counts = [None, [0] * len(windows), [0] * len(windows)]
+        self._score = 0
+
+    @property
+    def score(self):
+        return self._score
+
+    def reset(self, position):
+        """Sets the evaluator to the pieces of position."""
+        for counts in self._counts[1:]:
+            for index in range(len(counts)):
+                counts[index] = 0
+        self._score = 0
+        for piece in (1, 2):
+            bitboard = position.bitboards[piece]
+            cell = 0
+            while bitboard:
+                if bitboard & 1:
+                    self.play(cell, piece)
+                bitboard >>= 1
+                cell += 1
+
+    def play(self, cell, piece):
+        """Adds piece in cell and updates the score."""
+        own = self._counts[piece]
+        other = self._counts[3 - piece]
+        delta = self._delta[piece]
+        score = self._score + self._center[piece][cell]
+        for index in self._cell_windows[cell]:
+            score += delta[own[index]][other[index]]
+            own[index] += 1
+        self._score = score
+
+    def undo(self, cell, piece):
+        """Removes piece from cell and updates the score."""
+        own = self._counts[piece]
+        other = self._counts[3 - piece]
+        delta = self._delta[piece]
+        score = self._score - self._center[piece][cell]
+        for index in self._cell_windows[cell]:
+            own[index] -= 1
+            score -= delta[own[index]][other[index]]
+        self._score = score
@@ -5,6 +5,8 @@ import math
 import random
 from board import Board
 from ai import Minimax_AI
+from evaluation import THREAT_VALUE
+from background import BackgroundMove
 
 
 # function to draw the board in pygame
@@ -27,6 +29,16 @@ def draw_board(board):
     pygame.display.update()
 
 
+# function to show in the top bar that the AI is searching
+def draw_thinking(progress):
+    completed, depth, nodes = progress
+    pygame.draw.rect(screen, colors["black"], (0, 0, width, SQUARESIZE))
+    label = smallfont.render("thinking... depth %d  %d nodes" % (depth, nodes),
+                             1, colors["yellow"])
+    screen.blit(label, (10, SQUARESIZE // 3))
+    pygame.display.update()
+
+
 if __name__ == '__main__':
     # colors for game
     colors = {"blue": (0, 0, 255),
@@ -47,7 +59,17 @@ if __name__ == '__main__':
     # initialize AI
     ai_depth = 6
     ai_player = random.choice(players)
-    ai = Minimax_AI(ai_depth, ai_player, ROW_COUNT, COLUMN_COUNT)
+    # the seed makes the AI choose randomly between moves of equal value
+    ai_seed = random.randrange(2**32)
+    ai = Minimax_AI(ai_depth, ai_player, ROW_COUNT,
+                    COLUMN_COUNT, seed=ai_seed, threat_value=THREAT_VALUE)
+    # search the replies while the player thinks (see Minimax_AI.ponder)
+    ai_ponder = True
+    # None to search ai_depth moves ahead, or the milliseconds of every
+    # move for an iterative deepening search
+    ai_time_limit_ms = None
+    # move being searched in a worker thread, so the window keeps running
+    ai_move = None
 
     # decide turns; if turn is 0 player moves first
     if ai_player == 2:
@@ -71,6 +93,7 @@ if __name__ == '__main__':
     pygame.display.update()
 
     myfont = pygame.font.SysFont("monospace", 75)
+    smallfont = pygame.font.SysFont("monospace", 30)
 
     game_over = False
     while not game_over:
@@ -80,6 +103,7 @@ if __name__ == '__main__':
             while not turn_over:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
+                        ai.close()
                         sys.exit()
 
                     if event.type == pygame.MOUSEMOTION:
@@ -117,7 +141,20 @@ if __name__ == '__main__':
 
         # Ask for Player 2 Input
         else:
-            col = ai.make_move(board.status)
+            if ai_move is None:
+                ai_move = BackgroundMove(ai, board.status, ai_time_limit_ms)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    ai_move.cancel()
+                    ai.close()
+                    sys.exit()
+            if not ai_move.done:
+                draw_thinking(ai_move.progress)
+                pygame.time.wait(30)
+                continue
+            col = ai_move.result
+            ai_move = None
+            pygame.draw.rect(screen, colors["black"], (0, 0, width, SQUARESIZE))
 
             if board.is_valid_location(col):
                 row = board.get_next_open_row(col)
@@ -128,6 +165,8 @@ if __name__ == '__main__':
                         "AI win!!", 1, colors["red"])
                     screen.blit(label, (40, 10))
                     game_over = True
+                elif ai_ponder:
+                    ai.ponder(board.status)
 
             draw_board(board.status)
 
@@ -135,4 +174,5 @@ if __name__ == '__main__':
         turn = turn % 2
 
         if game_over:
+            ai.close()
             pygame.time.wait(3000)
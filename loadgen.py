@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+import numpy as np
+from board import Board
+from service import MoveService
+
+
+def new_game(rows, columns, rng, opening_moves):
+    """Returns a Board after opening_moves random moves."""
+    board = Board(rows, columns)
+    for turn in range(opening_moves):
+        play_random(board, 1 + turn % 2, rng)
+    return board
+
+
+def play_random(board, piece, rng):
+    cols = [c for c in range(board.columns) if board.is_valid_location(c)]
+    col = rng.choice(cols)
+    board.insert_piece(board.get_next_open_row(col), col, piece)
+
+
+def is_over(board):
+    return board.is_winning_position(1) or board.is_winning_position(2) or \
+        not any(board.is_valid_location(c) for c in range(board.columns))
+
+
+def run(args):
+    """Plays args.games games at the same time against random opponents,
+    asking the service for the AI moves of all of them in one batch per
+    turn. Prints the moves per second and the latency of the batches."""
+    rng = random.Random(args.seed)
+    service = MoveService(args.depth, args.rows, args.columns, workers=args.workers,
+                          table_mb=args.table_mb, time_limit_ms=args.time_limit_ms)
+    games = [new_game(args.rows, args.columns, rng, 2 * rng.randrange(3))
+             for _ in range(args.games)]
+    moves = 0
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(args.turns):
+        games = [game for game in games if not is_over(game)]
+        if not games:
+            break
+        batch_start = time.perf_counter()
+        cols = service.make_moves([game.status for game in games])
+        latencies.append(time.perf_counter() - batch_start)
+        moves += len(games)
+        # the AI plays player 1, a random opponent plays player 2
+        for game, col in zip(games, cols):
+            game.insert_piece(game.get_next_open_row(col), col, 1)
+            if not is_over(game):
+                play_random(game, 2, rng)
+    elapsed = time.perf_counter() - start
+    service.close()
+    latencies = np.array(latencies) * 1000
+    print('moves %d  time %.2fs  moves/s %.1f' % (moves, elapsed, moves / elapsed))
+    print('batch latency ms  p50 %.1f  p95 %.1f  max %.1f'
+          % (np.percentile(latencies, 50), np.percentile(latencies, 95), latencies.max()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Load generator for the batch move service')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--turns', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--time-limit-ms', type=float, default=None)
+    parser.add_argument('--table-mb', type=float, default=16)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    run(parser.parse_args())
@@ -1,64 +1,109 @@
-from ai import Minimax_AI
-from board import Board
-import numpy
-import pickle
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bitboard import Position
+from openingbook import OpeningBook, DEFAULT_BOOK, book_path, canonical_key
 
-# one dict for each player
-first5moves1 = {}
-first5moves2 = {}
+# AIs of the worker process, one per player
+_ais = {}
 
-# size of board
-ROW_COUNT = 6
-COLUMN_COUNT = 7
 
-# players
-ai_players = [1, 2]
+def position_of(moves, rows, columns):
+    """Returns the position after playing the columns in the string moves,
+    player 1 first."""
+    position = Position(rows, columns)
+    for index, col in enumerate(moves):
+        position.play(int(col), 1 + index % 2)
+    return position
 
-# iterate for both players
-for ai_player in ai_players:
-    if ai_player == 1:
-        opp_player = 2
-    else:
-        opp_player = 1
-    # create board
-    board = Board(ROW_COUNT, COLUMN_COUNT)
-    # initialize AI
-    ai_depth = 6
-    ai = Minimax_AI(ai_depth, ai_player, ROW_COUNT, COLUMN_COUNT)
 
-    if ai_player == 1:
-        col = ai.make_move(board.status)
-        # add info to dict
-        board_str = ''
-        for r in board.status:
-            for c in r:
-                board_str = board_str + str(c)
-        first5moves1[board_str] = col
+def enumerate_positions(rows, columns, max_ply):
+    """Returns the moves (a string of columns) of every position with up to
+    max_ply pieces where the game is not over. Only one of a position and
+    its mirror image is returned."""
+    if columns > 10:
+        raise ValueError('moves are stored as one digit per column')
+    positions = []
+    seen = set()
+    level = ['']
+    for ply in range(max_ply + 1):
+        next_level = []
+        for moves in level:
+            position = position_of(moves, rows, columns)
+            player = 1 + ply % 2
+            key = canonical_key(position, player)[0]
+            if key in seen or position.is_win(1) or position.is_win(2) or position.is_full():
+                continue
+            seen.add(key)
+            positions.append(moves)
+            next_level.extend(moves + str(col) for col in position.actions())
+        level = next_level
+    return positions
 
-        row = board.get_next_open_row(col)
-        board.insert_piece(row, col, ai_player)
 
-    # at least tens pieces need to be move
-    board_tmp0 = board.status
-    # check all possibilities 7 columns
-    for column in range(COLUMN_COUNT):
-        board.status = board_tmp0
-        row = board.get_next_open_row(column)
-        board.insert_piece(row, column, opp_player)
-        col = ai.make_move(board.status)
-        # add info to dict
-        board_str = ''
-        for r in board.status:
-            for c in r:
-                board_str = board_str + str(c)
-        if ai_player == 1:
-            first5moves1[board_str] = col
-        else:
-            first5moves2[board_str] = col
+def search_position(moves, rows, columns, depth, table_mb):
+    """Returns moves and the column chosen by the AI of the player to move."""
+    from ai import Minimax_AI
+    player = 1 + len(moves) % 2
+    if player not in _ais:
+        _ais[player] = Minimax_AI(depth, player, rows, columns, table_mb, book=None)
+    position = position_of(moves, rows, columns)
+    return moves, _ais[player].make_move(position.to_status())
 
 
-with open('firstmove1', 'wb') as file:
-    pickle.dump(first5moves1, file)
+def load_checkpoint(path):
+    """Returns a dict moves -> column with the positions already searched."""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                parts = line.split()
+                # a line cut by a crash has no column
+                if len(parts) == 2:
+                    done[parts[0].strip('-')] = int(parts[1])
+    return done
 
-with open('firstmove2', 'wb') as file:
-    pickle.dump(first5moves2, file)
+
+def build_book(args):
+    """Searches every position up to args.ply pieces in a pool of processes
+    and writes the opening book. Every result is appended to the checkpoint
+    file, so a new run with the same checkpoint skips what is done."""
+    positions = enumerate_positions(args.rows, args.columns, args.ply)
+    done = load_checkpoint(args.checkpoint)
+    pending = [moves for moves in positions if moves not in done]
+    print('%d positions, %d in checkpoint, %d to search'
+          % (len(positions), len(positions) - len(pending), len(pending)))
+
+    with open(args.checkpoint, 'a') as checkpoint:
+        with ProcessPoolExecutor(args.workers) as executor:
+            futures = [executor.submit(search_position, moves, args.rows, args.columns,
+                                       args.depth, args.table_mb)
+                       for moves in pending]
+            for count, future in enumerate(as_completed(futures), 1):
+                moves, col = future.result()
+                done[moves] = col
+                # '-' marks the empty board, so every line has two fields
+                checkpoint.write('%s %d\n' % (moves or '-', col))
+                checkpoint.flush()
+                if count % 100 == 0:
+                    print('%d/%d' % (count, len(pending)))
+
+    entries = [(position_of(moves, args.rows, args.columns), 1 + len(moves) % 2, done[moves])
+               for moves in positions]
+    OpeningBook.write(args.output, args.rows, args.columns, entries)
+    print('%d positions written to %s' % (len(entries), args.output))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Creates the opening book searching every position up to --ply pieces')
+    parser.add_argument('--ply', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--table-mb', type=float, default=16)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--checkpoint', default='openingbook.checkpoint')
+    parser.add_argument('--output', default=book_path(DEFAULT_BOOK),
+                        help='the AI reads openingbook.bin from the package directory')
+    build_book(parser.parse_args())
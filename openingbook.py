@@ -0,0 +1,133 @@
+import bisect
+import mmap
+import os
+import struct
+
+MAGIC = b'C4BK'
+VERSION = 1
+# magic, version, rows, columns, max ply, number of entries
+HEADER = struct.Struct('<4sHBBB3xI')
+# xor-ed to the key of the positions where the AI is player 2
+PLAYER2_KEY = 0xD1B54A32D192ED03
+# relative paths of books are resolved from the directory of this module
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BOOK = 'openingbook.bin'
+
+# books opened by get_book, shared by every AI of the process
+_books = {}
+
+
+def book_path(path=DEFAULT_BOOK):
+    """Returns the absolute path of a book, a relative path is taken from
+    the directory of this module and not from the current directory."""
+    return os.path.normpath(os.path.join(PACKAGE_DIR, path))
+
+
+def get_book(path=DEFAULT_BOOK):
+    """Returns the OpeningBook in path (see book_path) shared by the whole
+    process. The file is opened the first time it is asked for, the book
+    is read only so every AI can use it at the same time. It must not be
+    closed."""
+    path = book_path(path)
+    book = _books.get(path)
+    if book is None:
+        book = _books.setdefault(path, OpeningBook(path))
+    return book
+
+
+def canonical_key(position, player):
+    """Returns the book key of position for the AI playing as player and
+    True if the key is the one of the mirrored position.
+    A position and its mirror image have the same key."""
+    key, mirrored = position.canonical_key()
+    if player == 2:
+        key ^= PLAYER2_KEY
+    return key, mirrored
+
+
+class OpeningBook:
+    """Read only opening book stored in a binary file and opened with mmap.
+
+    The file has a header, the sorted 64 bits keys of the positions (see
+    canonical_key) and one byte with the column to play for each key. A
+    position and its mirror image are stored once, the column is mirrored
+    back when the position found is the mirrored one. The file is not
+    copied in memory, so every process that opens it shares the same pages.
+
+    It has the next instances variables:
+        * rows -> number of rows of the boards in the book
+        * columns -> number of columns of the boards in the book
+        * max_ply -> largest number of pieces of a position in the book
+        * size -> number of positions in the book
+
+    It has the next public methods:
+        * .lookup(position, player) -> returns the column to play or None
+        * .close() -> closes the file
+        * OpeningBook.write(path, rows, columns, entries) -> creates a book file
+    """
+
+    def __init__(self, path):
+        """Opens the book file in path."""
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._rows, self._columns, self._max_ply, self._size = \
+            HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError('%s is not an opening book' % path)
+        keys_end = HEADER.size + 8 * self._size
+        view = memoryview(self._mmap)
+        # the keys are little endian, like the native order of x86 and arm
+        self._keys = view[HEADER.size:keys_end].cast('Q')
+        self._moves = view[keys_end:keys_end + self._size]
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def max_ply(self):
+        return self._max_ply
+
+    @property
+    def size(self):
+        return self._size
+
+    def lookup(self, position, player):
+        """Returns the column to play in position for the AI playing as
+        player, or None if the position is not in the book."""
+        if position.count > self._max_ply:
+            return None
+        key, mirrored = canonical_key(position, player)
+        index = bisect.bisect_left(self._keys, key)
+        if index == self._size or self._keys[index] != key:
+            return None
+        col = self._moves[index]
+        return self._columns - 1 - col if mirrored else col
+
+    def close(self):
+        """Closes the file."""
+        self._keys.release()
+        self._moves.release()
+        self._mmap.close()
+
+    @staticmethod
+    def write(path, rows, columns, entries):
+        """Creates a book file in path.
+        entries is a list of (position, player, col): the AI playing as
+        player plays col in position."""
+        book = {}
+        max_ply = 0
+        for position, player, col in entries:
+            key, mirrored = canonical_key(position, player)
+            book[key] = columns - 1 - col if mirrored else col
+            max_ply = max(max_ply, position.count)
+        keys = sorted(book)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, rows, columns, max_ply, len(keys)))
+            file.write(struct.pack('<%dQ' % len(keys), *keys))
+            file.write(bytes(book[key] for key in keys))
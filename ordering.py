@@ -0,0 +1,88 @@
+import random
+
+
+class MoveOrderer:
+    """Decides in which order the search tries the columns of a position.
+
+    The columns are sorted by:
+        1. the best move saved in the transposition table
+        2. the killer moves: the last two moves that caused a cutoff at the
+            same number of pieces in the board
+        3. the history score: how much search the move saved by causing
+            cutoffs when it was dropped in the same cell by the same piece
+        4. the distance to the center column, the center first
+
+    Without seed the order is always the same for the same position and
+    history. With seed, columns with the same score are shuffled with a
+    random.Random(seed), so the AI can vary its play in a reproducible way.
+
+    The columns are returned in a list that belongs to the number of pieces
+    of the position and is reused by the next call with the same number of
+    pieces, so the search does not create a list at every node. The list
+    must not be kept after the moves of the position are searched.
+
+    It has the next public methods:
+        * .order(position, piece, table_move) -> returns the sorted columns
+        * .cutoff(position, piece, col, depth) -> records a move that caused a cutoff
+        * .new_search() -> ages the history and forgets the killer moves
+    """
+
+    def __init__(self, rows, columns, seed=None):
+        """Create an orderer for boards of rows and columns."""
+        self._columns = columns
+        center = columns // 2
+        # stable sort keeps left before right for the same distance
+        self._center_order = sorted(range(columns), key=lambda c: abs(c - center))
+        self._center_distance = [abs(c - center) for c in range(columns)]
+        self._killers = [[None, None] for _ in range(rows * columns + 1)]
+        self._history = [[0] * (columns * (rows + 1)) for _ in range(3)]
+        self._rng = random.Random(seed) if seed is not None else None
+        self._moves = [[] for _ in range(rows * columns + 1)]
+        self._scores = [[0] * columns for _ in range(rows * columns + 1)]
+
+    def order(self, position, piece, table_move):
+        """Returns the playable columns of position from best to worst for piece."""
+        killers = self._killers[position.count]
+        history = self._history[piece]
+        heights = position.heights
+        moves = self._moves[position.count]
+        moves.clear()
+        for col in self._center_order:
+            if position.can_play(col):
+                moves.append(col)
+        if self._rng is not None:
+            self._rng.shuffle(moves)
+
+        # one number per column: tier, then history, then distance to center
+        scores = self._scores[position.count]
+        for col in moves:
+            if col == table_move:
+                tier = 3
+            elif col == killers[0]:
+                tier = 2
+            elif col == killers[1]:
+                tier = 1
+            else:
+                tier = 0
+            scores[col] = self._center_distance[col] - \
+                ((tier << 40) + history[heights[col]]) * self._columns
+        # stable, so equal scores keep the shuffled order
+        moves.sort(key=scores.__getitem__)
+        return moves
+
+    def cutoff(self, position, piece, col, depth):
+        """Records that dropping piece in col caused a cutoff with depth moves left.
+        col must not be played in position."""
+        killers = self._killers[position.count]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self._history[piece][position.heights[col]] += depth * depth
+
+    def new_search(self):
+        """Halves the history scores and forgets the killer moves."""
+        for history in self._history:
+            for cell in range(len(history)):
+                history[cell] //= 2
+        for killers in self._killers:
+            killers[0] = killers[1] = None
@@ -0,0 +1,148 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# state of every worker process, set by _init_worker
+_shared_alpha = None
+_worker_ais = {}
+
+
+def _init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _ping():
+    return True
+
+
+def _worker_ai(player, rows, columns, connect, table_mb, threat_value, search_id):
+    """Returns the AI of this worker process for player. The AI and its
+    transposition table are kept between moves, like in the main process."""
+    from ai import Minimax_AI
+    key = (player, rows, columns, connect, table_mb, threat_value)
+    if key not in _worker_ais:
+        _worker_ais[key] = [Minimax_AI(0, player, rows, columns, table_mb, book=None,
+                                       connect=connect, threat_value=threat_value), None]
+    ai, last_search = _worker_ais[key]
+    if last_search != search_id:
+        ai.table.new_search()
+        _worker_ais[key][1] = search_id
+    return ai
+
+
+def _search_move(position, col, depth, player, table_mb, threat_value, search_id):
+    """Searches the root move col of position in a worker process.
+    Returns the value of the move for player and the nodes searched."""
+    ai = _worker_ai(player, position.rows, position.columns, position.connect,
+                    table_mb, threat_value, search_id)
+    # values are integers: searching above alpha-1 finds the exact value
+    # of every move as good as the best one found so far
+    alpha = _shared_alpha.value - 1
+    position.play(col, player)
+    ai._evaluator.reset(position)
+    ai._nodes = 0
+    value, _ = ai._search(position, depth, False, alpha, float('inf'))
+    with _shared_alpha.get_lock():
+        if value > _shared_alpha.value:
+            _shared_alpha.value = value
+    return value, ai._nodes
+
+
+class SearchPool:
+    """Pool of processes that search the moves of the root of a position.
+
+    All the workers share the best value found at the root (alpha), so a
+    move started after a good one was found is searched with a narrow window.
+    A move that fails low returns a value of at most alpha-1 and can not be
+    chosen, every other move gets its exact value, so the column chosen is
+    the same as the one of the sequential search at the same depth.
+
+    Every worker keeps its own Minimax_AI with its own transposition table
+    between moves. The tables are not shared: a table in shared memory
+    would need a lock for every probe, which costs more in Python than
+    the nodes it saves.
+
+    It has the next instances variables:
+        * workers -> number of processes
+
+    It has the next public methods:
+        * .search_moves(position, moves, depth, player, alpha) -> values of moves
+        * .close() -> stops the processes
+    """
+
+    def __init__(self, workers, table_mb=16, threat_value=0):
+        """Create a pool of workers processes, each one with a transposition
+        table of table_mb megabytes. threat_value is the one of the AI."""
+        self._workers = workers
+        self._table_mb = table_mb
+        self._threat_value = threat_value
+        self._alpha = multiprocessing.Value('d', float('-inf'))
+        self._executor = ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(self._alpha,))
+        self._search_id = 0
+        # start the processes now instead of in the first move
+        for future in [self._executor.submit(_ping) for _ in range(workers)]:
+            future.result()
+
+    @property
+    def workers(self):
+        return self._workers
+
+    def search_moves(self, position, moves, depth, player, alpha):
+        """Searches every column of moves in position, dropping a piece of
+        player, with depth moves left after it.
+        alpha is the value of the best move already searched.
+        Returns a list of (value, nodes), one for each move."""
+        self._search_id += 1
+        self._alpha.value = alpha
+        futures = [self._executor.submit(_search_move, position, col, depth, player,
+                                         self._table_mb, self._threat_value,
+                                         self._search_id)
+                   for col in moves]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Stops the worker processes."""
+        self._executor.shutdown()
+
+
+def benchmark(depth, workers_list, moves):
+    """Prints nodes per second of make_move for each number of workers,
+    after playing the columns in moves from the empty board."""
+    import numpy as np
+    from ai import Minimax_AI
+    board = np.zeros((6, 7))
+    for index, col in enumerate(moves):
+        col = int(col)
+        board[int((board[:, col] != 0).sum())][col] = 1 + index % 2
+    player = 1 + len(moves) % 2
+    base = None
+    for workers in workers_list:
+        # without book and solver, the move is always searched
+        ai = Minimax_AI(depth, player, 6, 7, workers=workers, book=None, solver_cells=0)
+        start = time.perf_counter()
+        col = ai.make_move(board)
+        elapsed = time.perf_counter() - start
+        ai.close()
+        if ai.nodes <= 1:
+            # a win at once or the threats decide the move at the root
+            print('workers %2d  col %d  the search ends at the root, nothing to measure'
+                  % (workers, col))
+            return
+        speed = ai.nodes / elapsed
+        base = base or speed
+        print('workers %2d  col %d  nodes %9d  time %7.2fs  nodes/s %9.0f  scaling %.2f'
+              % (workers, col, ai.nodes, elapsed, speed, speed / base))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Node throughput of the parallel search')
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--moves', default='3322',
+                        help='columns played from the empty board')
+    args = parser.parse_args()
+    benchmark(args.depth, args.workers, args.moves)
@@ -0,0 +1,94 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+import numpy as np
+from ai import Minimax_AI
+from bitboard import Position
+
+
+class CountingAI(Minimax_AI):
+    """Minimax_AI that counts the nodes of the board copying _minimax."""
+
+    def _minimax(self, board, current_depth, max_turn, alpha, beta, node):
+        self._nodes += 1
+        return super()._minimax(board, current_depth, max_turn, alpha, beta, node)
+
+
+class GCMonitor:
+    """Counts the collections of the garbage collector and their time."""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pause = 0
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        else:
+            self.collections[info['generation']] += 1
+            self.pause += time.perf_counter() - self._start
+
+    def __enter__(self):
+        gc.collect()
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+
+
+def measure(name, search, get_nodes, trace):
+    """Runs search and prints its nodes, time, memory and collections."""
+    if trace:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    with GCMonitor() as monitor:
+        start = time.perf_counter()
+        search()
+        elapsed = time.perf_counter() - start
+    nodes = get_nodes()
+    line = '%-9s nodes %8d  time %6.2fs  gc %s  gc pause %.1f ms  new blocks/node %.2f' % (
+        name, nodes, elapsed, '/'.join(map(str, monitor.collections)),
+        monitor.pause * 1000, (sys.getallocatedblocks() - blocks) / nodes)
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        line += '  peak bytes/node %.1f' % (peak / nodes)
+    print(line)
+
+
+def main(args):
+    board = np.zeros((6, 7))
+    for index, col in enumerate(args.moves):
+        col = int(col)
+        board[int((board[:, col] != 0).sum())][col] = 1 + index % 2
+    player = 1 + len(args.moves) % 2
+
+    legacy = CountingAI(args.legacy_depth, player, 6, 7, book=None, solver_cells=0)
+    legacy._nodes = 0
+    measure('_minimax', lambda: legacy._minimax(
+        board, 0, True, float('-inf'), float('inf'), 0), lambda: legacy.nodes, args.trace)
+
+    ai = Minimax_AI(args.depth, player, 6, 7, args.table_mb, book=None, solver_cells=0)
+    position = Position.from_status(board, 6, 7)
+    ai._evaluator.reset(position)
+    measure('_search', lambda: ai._search(
+        position, args.depth, True, float('-inf'), float('inf')), lambda: ai.nodes, args.trace)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Allocations and garbage collections of the board copying '
+        'search (_minimax) and the in place search (_search)')
+    parser.add_argument('--depth', type=int, default=9)
+    parser.add_argument('--legacy-depth', type=int, default=5,
+                        help='depth of _minimax, that is much slower')
+    parser.add_argument('--moves', default='3322',
+                        help='columns played from the empty board')
+    parser.add_argument('--table-mb', type=float, default=16)
+    parser.add_argument('--trace', action='store_true',
+                        help='also report the peak of tracemalloc (slow)')
+    main(parser.parse_args())
@@ -0,0 +1,166 @@
+import argparse
+import glob
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from arena import random_opening
+from bitboard import Position
+
+CHUNK_PATTERN = 'chunk_%06d.npy'
+
+
+def record_dtype(rows, columns):
+    """Returns the NumPy dtype of a record of a rows x columns board:
+        * board -> pieces of the position, row 0 is the bottom, 0 is empty
+        * to_move -> player to move (1 or 2)
+        * ply -> pieces in the board
+        * score -> value of the search for the player to move
+        * move -> column chosen by the search
+        * outcome -> result of the game for the player to move: 1 win,
+            0 draw, -1 loss
+    """
+    return np.dtype([
+        ('board', np.int8, (rows, columns)),
+        ('to_move', np.int8),
+        ('ply', np.int16),
+        ('score', np.int16),
+        ('move', np.int8),
+        ('outcome', np.int8),
+    ])
+
+
+def game_records(seed, depth, rows=6, columns=7, connect=4, opening_plies=2,
+                 time_limit_ms=None, threat_value=0, table_mb=16):
+    """Plays a game of Minimax_AI against itself after opening_plies random
+    moves and yields a record (board, to_move, ply, score, move, outcome)
+    for every move searched by an AI, once the outcome is known.
+    seed chooses the opening and the moves of equal value."""
+    from ai import Minimax_AI
+    rng = random.Random(seed)
+    opening = random_opening(rng, rows, columns, opening_plies, connect)
+    ais = {player: Minimax_AI(depth, player, rows, columns, table_mb, seed=rng.randrange(2**32),
+                              book=None, solver_cells=0, connect=connect,
+                              threat_value=threat_value)
+           for player in (1, 2)}
+    position = Position(rows, columns, connect)
+    moves = []
+    winner = 0
+    for turn in range(rows * columns):
+        piece = 1 + turn % 2
+        if turn < len(opening):
+            col = int(opening[turn])
+        else:
+            board = position.to_status()
+            col = ais[piece].make_move(np.array(board), time_limit_ms)
+            moves.append((board, piece, turn, ais[piece].value, col))
+        position.play(col, piece)
+        if position.is_win(piece):
+            winner = piece
+            break
+    for ai in ais.values():
+        ai.close()
+    for board, piece, ply, score, col in moves:
+        outcome = 0 if winner == 0 else (1 if winner == piece else -1)
+        yield board, piece, ply, score, col, outcome
+
+
+def _play_game(seed, options):
+    """Returns the records of game_records as a list, to send them from a
+    worker process."""
+    return list(game_records(seed, **options))
+
+
+def selfplay_records(games, seed=0, workers=1, **options):
+    """Yields the records of games self-play games (see game_records for
+    options). With workers > 1 the games are played in a pool of processes
+    and the records of every game come as soon as it ends, with at most two
+    games per process waiting, so the memory does not grow with games."""
+    seeds = (seed * 1000003 + game for game in range(games))
+    if workers <= 1:
+        for game_seed in seeds:
+            yield from game_records(game_seed, **options)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        for game_seed in seeds:
+            pending.add(executor.submit(_play_game, game_seed, options))
+            if len(pending) < 2 * workers:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+
+def write_chunks(records, directory, rows=6, columns=7, chunk_size=65536):
+    """Writes records to directory as .npy files of chunk_size records
+    (the last one can be shorter), filling one preallocated array, so the
+    memory used does not depend on the number of records.
+    Returns the number of records written."""
+    os.makedirs(directory, exist_ok=True)
+    chunk = np.zeros(chunk_size, dtype=record_dtype(rows, columns))
+    # continue after the chunks already in directory
+    index = len(chunk_paths(directory))
+    filled = 0
+    total = 0
+    for record in records:
+        chunk[filled] = record
+        filled += 1
+        if filled == chunk_size:
+            np.save(os.path.join(directory, CHUNK_PATTERN % index), chunk)
+            index += 1
+            total += filled
+            filled = 0
+    if filled:
+        np.save(os.path.join(directory, CHUNK_PATTERN % index), chunk[:filled])
+        total += filled
+    return total
+
+
+def chunk_paths(directory):
+    """Returns the paths of the chunks in directory, in order."""
+    return sorted(glob.glob(os.path.join(directory, CHUNK_PATTERN.replace('%06d', '*'))))
+
+
+def load_chunks(directory):
+    """Returns a list with every chunk of directory as a read only array
+    mapped from its file: nothing is read until a record is used, and
+    slices and fields (chunk['board']) are views of the file."""
+    return [np.load(path, mmap_mode='r') for path in chunk_paths(directory)]
+
+
+def run(args):
+    """Plays args.games games and writes their records to args.output."""
+    records = selfplay_records(
+        args.games, args.seed, args.workers, depth=args.depth, rows=args.rows,
+        columns=args.columns, connect=args.connect, opening_plies=args.opening_plies,
+        time_limit_ms=args.time_limit_ms, threat_value=args.threat_value,
+        table_mb=args.table_mb)
+    total = write_chunks(records, args.output, args.rows, args.columns, args.chunk_size)
+    print('%d positions written to %s' % (total, args.output))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Plays Minimax_AI against itself and saves every position searched '
+        'with its score, move and the result of the game, for training.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--time-limit-ms', type=int, default=None,
+                        help='time of every move, instead of a fixed depth')
+    parser.add_argument('--opening-plies', type=int, default=2,
+                        help='random moves before the AIs play')
+    parser.add_argument('--threat-value', type=int, default=0)
+    parser.add_argument('--table-mb', type=float, default=16)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--columns', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=65536,
+                        help='records in every .npy file')
+    parser.add_argument('--output', default='selfplay_data',
+                        help='directory of the chunks, new chunks are added after the old ones')
+    run(parser.parse_args())
@@ -0,0 +1,88 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# engines of the process, set by _init_engines
+_engines = {}
+
+
+def _init_engines(depth, rows, columns, table_mb, time_limit_ms):
+    """Creates one Minimax_AI for each player. They live as long as the
+    process, so the opening book is read once and the transposition
+    tables are shared by all the games served by the process."""
+    from ai import Minimax_AI
+    for player in (1, 2):
+        _engines[player] = Minimax_AI(depth, player, rows, columns, table_mb)
+    _engines['time_limit_ms'] = time_limit_ms
+
+
+def _to_move(board):
+    """Returns which player moves in board."""
+    pieces = [0, 0, 0]
+    for row in board:
+        for cell in row:
+            pieces[int(cell)] += 1
+    return 1 if pieces[1] == pieces[2] else 2
+
+
+def _make_move(board, player=None):
+    """Returns the column played by the engine of player (by default the
+    player to move) in board."""
+    if player is None:
+        player = _to_move(board)
+    return _engines[player].make_move(board, _engines['time_limit_ms'])
+
+
+class MoveService:
+    """Computes the moves of many games at the same time.
+
+    The moves are searched by a pool of processes. Every process has one
+    Minimax_AI per player that is reused by all the games, so the opening
+    book is loaded once per process and the positions searched for one
+    game are in the transposition table for the next ones.
+
+    With time_limit_ms every move is searched with iterative deepening and
+    takes at most about that time, which bounds the latency of a request.
+    Without it every move is searched depth moves ahead.
+
+    It has the next instances variables:
+        * workers -> number of processes, 0 to search in a thread of this process
+
+    It has the next public methods:
+        * .make_moves(boards, players) -> returns a list with one column per board
+        * .make_move(board, player) -> coroutine that returns the column for board
+        * .close() -> stops the processes
+    """
+
+    def __init__(self, depth, rows, columns, workers=1, table_mb=16, time_limit_ms=None):
+        """Create a service for boards of rows and columns."""
+        self._workers = workers
+        initargs = (depth, rows, columns, table_mb, time_limit_ms)
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(
+                workers, initializer=_init_engines, initargs=initargs)
+        else:
+            # one thread, the engines can not search two moves at once
+            _init_engines(*initargs)
+            self._executor = ThreadPoolExecutor(1)
+
+    @property
+    def workers(self):
+        return self._workers
+
+    def make_moves(self, boards, players=None):
+        """Returns a list with the column to play in each board.
+        players has the player of the AI in each board, by default the
+        player to move."""
+        if players is None:
+            players = [None] * len(boards)
+        chunksize = max(1, len(boards) // (4 * max(1, self._workers)))
+        return list(self._executor.map(_make_move, boards, players, chunksize=chunksize))
+
+    async def make_move(self, board, player=None):
+        """Returns the column to play in board without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _make_move, board, player)
+
+    def close(self):
+        """Stops the processes."""
+        self._executor.shutdown()
@@ -0,0 +1,133 @@
+import time
+
+
+class SearchStats:
+    """Statistics of the search of one move of Minimax_AI.
+
+    The search counts the cutoffs while it runs, everything else is read
+    from counters that the AI and the transposition table already keep,
+    at the start and the end of every iteration (every depth of an
+    iterative deepening search, or the only depth of a fixed search).
+
+    An iteration is a dict with:
+        * depth -> number of moves searched
+        * completed -> False if the time was over before the end
+        * nodes -> nodes visited by the iteration
+        * cutoffs -> beta cutoffs (moves not searched after a refutation)
+        * first_move_cutoffs -> cutoffs caused by the first move tried
+        * first_move_cutoff_rate -> first_move_cutoffs / cutoffs
+        * table_probes -> lookups of the transposition table
+        * table_hits -> lookups that found the position
+        * table_hit_rate -> table_hits / table_probes
+        * eval_cache_probes, eval_cache_hits, eval_cache_hit_rate -> the
+            same for the EvaluationCache, only when the AI has one
+        * seconds -> time of the iteration
+        * nps -> nodes per second
+
+    It has the next instances variables:
+        * player -> player that moves
+        * pieces -> number of pieces in the board before the move
+        * move -> column chosen
+        * source -> 'book', 'solver' or 'search'
+        * principal_variation -> list with the columns of the best line found
+        * nodes -> nodes visited by the whole move
+        * seconds -> time of the whole move
+        * iterations -> list with one dict for every iteration
+        * cutoffs, first_move_cutoffs -> counters of the running iteration
+
+    It has the next public methods:
+        * .cutoff(first) -> counts a cutoff, first if by the first move tried
+        * .start_iteration(depth, nodes, table, cache) -> starts counting an iteration
+        * .end_iteration(nodes, table, completed, cache) -> saves the running iteration
+        * .finish(move, source, nodes, variation) -> saves the result of the move
+        * .to_dict() -> returns the statistics as a dict
+        * .to_json() -> returns the statistics as one line of JSON
+    """
+
+    def __init__(self, player, pieces):
+        """Starts the statistics of a move of player with pieces in the board."""
+        self.player = player
+        self.pieces = pieces
+        self.move = None
+        self.source = None
+        self.principal_variation = []
+        self.nodes = 0
+        self.seconds = 0.0
+        self.iterations = []
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._start = time.perf_counter()
+        self._iteration = None
+
+    def cutoff(self, first):
+        """Counts a cutoff, first is True if the move was the first one tried."""
+        self.cutoffs += 1
+        if first:
+            self.first_move_cutoffs += 1
+
+    def start_iteration(self, depth, nodes, table, cache=None):
+        """Starts an iteration of depth, nodes is the node counter of the AI.
+        cache is the EvaluationCache of the AI, or None."""
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        cache_counters = (cache.probes, cache.hits) if cache is not None else None
+        self._iteration = (depth, nodes, table.probes, table.hits, cache_counters,
+                           time.perf_counter())
+
+    def end_iteration(self, nodes, table, completed=True, cache=None):
+        """Saves the iteration started by start_iteration."""
+        depth, start_nodes, probes, hits, cache_counters, start = self._iteration
+        seconds = time.perf_counter() - start
+        nodes -= start_nodes
+        probes = table.probes - probes
+        hits = table.hits - hits
+        iteration = {
+            'depth': depth,
+            'completed': completed,
+            'nodes': nodes,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            'table_probes': probes,
+            'table_hits': hits,
+            'table_hit_rate': hits / probes if probes else 0.0,
+            'seconds': seconds,
+            'nps': nodes / seconds if seconds > 0 else 0.0,
+        }
+        if cache is not None and cache_counters is not None:
+            cache_probes = cache.probes - cache_counters[0]
+            cache_hits = cache.hits - cache_counters[1]
+            iteration['eval_cache_probes'] = cache_probes
+            iteration['eval_cache_hits'] = cache_hits
+            iteration['eval_cache_hit_rate'] = cache_hits / cache_probes if cache_probes else 0.0
+        self.iterations.append(iteration)
+        self._iteration = None
+
+    def finish(self, move, source, nodes, variation=()):
+        """Saves the column chosen, how it was chosen, the nodes of the move
+        and the principal variation."""
+        self.move = move
+        self.source = source
+        self.principal_variation = list(variation)
+        self.nodes = nodes
+        self.seconds = time.perf_counter() - self._start
+
+    def to_dict(self):
+        """Returns the statistics of the move as a dict."""
+        return {
+            'player': self.player,
+            'pieces': self.pieces,
+            'move': self.move,
+            'source': self.source,
+            'principal_variation': self.principal_variation,
+            'nodes': self.nodes,
+            'seconds': self.seconds,
+            'nps': self.nodes / self.seconds if self.seconds > 0 else 0.0,
+            'iterations': self.iterations,
+        }
+
+    def to_json(self):
+        """Returns the statistics of the move as one line of JSON."""
+        # imported here, so the AI does not load json when stats are off
+        import json
+        return json.dumps(self.to_dict())
@@ -0,0 +1,77 @@
+class EvaluationTables:
+    """Precomputed lines of a board shape and connect length.
+
+    A line is a group of connect consecutive cells in a row, a column or a
+    diagonal: the cells a player needs for a win. The tables are built once
+    per (rows, columns, connect) and shared, use EvaluationTables.get.
+
+    Cells of the bitboards follow the Position layout: every column uses
+    rows+1 bits, bit 0 is the bottom cell of column 0.
+
+    It has the next instances variables:
+        * rows -> number of rows in the board
+        * columns -> number of columns in the board
+        * connect -> number of pieces in a row that win
+        * stride -> bits used by every column
+        * shifts -> bit distance between neighbours of a line: vertical,
+            horizontal, and both diagonals
+        * lines -> list with the (row, col) cells of every line
+        * line_masks -> list with the bitboard of every line
+        * line_cells -> list with the cells of every line as row*columns+col,
+            the index in a board flattened by rows
+        * cell_lines -> list with the lines that go through every bit
+        * center_mask -> bitboard of the center column
+        * threat_masks -> dict player -> bitboard of the rows where a threat
+            of the player is worth the most: odd rows (1st, 3rd...) for
+            player 1, who moves first, and even rows for player 2
+    """
+
+    _cache = {}
+
+    @classmethod
+    def get(cls, rows, columns, connect=4):
+        """Returns the shared tables of rows, columns and connect."""
+        shape = (rows, columns, connect)
+        if shape not in cls._cache:
+            cls._cache[shape] = cls(rows, columns, connect)
+        return cls._cache[shape]
+
+    def __init__(self, rows, columns, connect=4):
+        """Builds the tables, use EvaluationTables.get to share them."""
+        self.rows = rows
+        self.columns = columns
+        self.connect = connect
+        self.stride = rows + 1
+        self.shifts = (1, self.stride, self.stride - 1, self.stride + 1)
+
+        self.lines = []
+        for c in range(columns):
+            for r in range(rows):
+                # vertical, horizontal, positive and negative slope
+                for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_c = c + (connect - 1) * dc
+                    end_r = r + (connect - 1) * dr
+                    if end_c >= columns or not 0 <= end_r < rows:
+                        continue
+                    self.lines.append([(r + i * dr, c + i * dc) for i in range(connect)])
+
+        self.line_masks = []
+        self.line_cells = []
+        self.cell_lines = [[] for _ in range(columns * self.stride)]
+        for index, line in enumerate(self.lines):
+            mask = 0
+            for r, c in line:
+                mask |= 1 << (c * self.stride + r)
+                self.cell_lines[c * self.stride + r].append(index)
+            self.line_masks.append(mask)
+            self.line_cells.append([r * columns + c for r, c in line])
+
+        self.center_mask = ((1 << rows) - 1) << (columns // 2 * self.stride)
+
+        # a column filled to the end gives the odd rows to the first player
+        odd_rows = sum(1 << r for r in range(0, rows, 2))
+        even_rows = sum(1 << r for r in range(1, rows, 2))
+        self.threat_masks = {1: 0, 2: 0}
+        for c in range(columns):
+            self.threat_masks[1] |= odd_rows << (c * self.stride)
+            self.threat_masks[2] |= even_rows << (c * self.stride)
@@ -0,0 +1,60 @@
+import unittest
+import random
+from arena import parse_engine, random_opening, play_game, schedule, elo_ratings
+from bitboard import Position
+
+
+class TestArena(unittest.TestCase):
+
+    def test_parse_engine(self):
+        self.assertEqual(parse_engine('fast:depth=3,book=none,time_limit_ms=20.5'),
+                         ('fast', {'depth': 3, 'book': None, 'time_limit_ms': 20.5}))
+        self.assertEqual(parse_engine('default'), ('default', {}))
+        with self.assertRaises(ValueError):
+            parse_engine('bad:depht=3')
+
+    def test_random_opening(self):
+        rng = random.Random(18)
+        for _ in range(20):
+            moves = random_opening(rng, 6, 7, 6)
+            self.assertEqual(len(moves), 6)
+
+    def test_schedule(self):
+        engines = [('a', {}), ('b', {}), ('c', {})]
+        matches = schedule(engines, 2, 6, 7, 4, 2, 0)
+        self.assertEqual(len(matches), 2 * 3 * 2)
+        self.assertIn(([('b', {}), ('a', {})], matches[0][1]), matches)
+
+    def test_play_game(self):
+        engines = [('weak', {'depth': 1, 'book': None}), ('strong', {'depth': 4, 'book': None})]
+        game = play_game(engines, '33', 6, 7)
+        self.assertEqual(game['first'], 'weak')
+        self.assertTrue(game['moves'].startswith('33'))
+        self.assertEqual(len(game['times_ms']), len(game['moves']) - 2)
+        self.assertEqual(len(game['nodes']), len(game['moves']) - 2)
+        self.assertIn(game['result'], (0, 0.5, 1))
+        position = Position(6, 7)
+        for index, col in enumerate(game['moves']):
+            position.play(int(col), 1 + index % 2)
+        last = 1 + (len(game['moves']) - 1) % 2
+        if game['result'] != 0.5:
+            self.assertEqual(game['result'], 1 if last == 1 else 0)
+            self.assertTrue(position.is_win(last))
+        else:
+            self.assertTrue(position.is_full())
+
+    def test_elo_ratings(self):
+        games = [{'first': 'a', 'second': 'b', 'result': 1}] * 3 + \
+            [{'first': 'b', 'second': 'a', 'result': 0.5}] + \
+            [{'first': 'b', 'second': 'c', 'result': 1}] * 2
+        ratings = elo_ratings(games)
+        self.assertGreater(ratings['a'], ratings['b'])
+        self.assertGreater(ratings['b'], ratings['c'])
+        self.assertAlmostEqual(sum(ratings.values()), 0)
+        even = elo_ratings([{'first': 'a', 'second': 'b', 'result': 1},
+                            {'first': 'b', 'second': 'a', 'result': 1}])
+        self.assertAlmostEqual(even['a'], even['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import time
+import numpy as np
+from ai import Minimax_AI
+from background import BackgroundMove
+
+
+class TestBackgroundMove(unittest.TestCase):
+
+    def setUp(self):
+        self.board = np.zeros((6, 7))
+        self.board[0][3] = 1
+
+    def test_same_move(self):
+        ai = Minimax_AI(5, 2, 6, 7, book=None)
+        move = BackgroundMove(ai, self.board)
+        while not move.done:
+            time.sleep(0.01)
+        self.assertEqual(move.result, Minimax_AI(5, 2, 6, 7, book=None).make_move(self.board))
+        self.assertEqual(move.progress[0], 5)
+
+    def test_progress(self):
+        ai = Minimax_AI(5, 2, 6, 7, book=None)
+        move = BackgroundMove(ai, self.board, time_limit_ms=300)
+        self.assertIn(move.result, range(7))
+        completed, depth, nodes = move.progress
+        self.assertGreaterEqual(completed, 1)
+        self.assertGreater(nodes, 0)
+
+    def test_cancel(self):
+        for time_limit_ms in (None, 10000):
+            ai = Minimax_AI(14, 2, 6, 7, book=None)
+            move = BackgroundMove(ai, self.board, time_limit_ms)
+            time.sleep(0.1)
+            start = time.perf_counter()
+            move.cancel()
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertTrue(move.done)
+            self.assertIsNone(move.result)
+            # the AI can search again after a cancel
+            ai._depth = 3
+            self.assertIn(ai.make_move(self.board), range(7))
+
+    def test_cancel_while_pondering(self):
+        ai = Minimax_AI(12, 2, 6, 7, book=None)
+        pondered = np.array(self.board)
+        pondered[1][3] = 2
+        for _ in range(3):
+            ai.ponder(pondered)
+            time.sleep(0.1)
+            # the cancel comes while make_move stops the pondering
+            start = time.perf_counter()
+            move = BackgroundMove(ai, self.board)
+            move.cancel()
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertIsNone(move.result)
+        # the cancel is forgotten by the next move
+        ai._depth = 3
+        self.assertIn(BackgroundMove(ai, self.board).result, range(7))
+        self.assertIn(ai.make_move(self.board), range(7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import random
+import numpy as np
+from ai import Minimax_AI
+from bitboard import Position
+from batch_evaluation import (window_cells, bitboards_to_boards,
+                              evaluate_batch, evaluate_bitboards)
+
+
+class TestBatchEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(6)
+        self.positions = []
+        for _ in range(300):
+            position = Position(6, 7)
+            piece = 1
+            for _ in range(rng.randrange(43)):
+                if position.is_win(1) or position.is_win(2) or position.is_full():
+                    break
+                position.play(rng.choice(position.actions()), piece)
+                piece = 3 - piece
+            self.positions.append(position)
+        self.boards = np.array([p.to_status() for p in self.positions])
+
+    def test_window_cells(self):
+        windows = window_cells(6, 7)
+        self.assertEqual(windows.shape, (69, 4))
+        self.assertIn([0, 1, 2, 3], windows.tolist())
+
+    def test_same_value_as_utility(self):
+        for player in (1, 2):
+            ai = Minimax_AI(4, player, 6, 7)
+            win, loss, score = evaluate_batch(self.boards, player)
+            for index, board in enumerate(self.boards):
+                self.assertEqual(score[index], ai._utility(board))
+                self.assertEqual(win[index], bool(ai._is_endgame(board, player)))
+                self.assertEqual(loss[index], bool(ai._is_endgame(board, ai.opponent)))
+
+    def test_bitboards(self):
+        bitboards = [p.bitboards[1:] for p in self.positions]
+        self.assertTrue((bitboards_to_boards(bitboards, 6, 7) == self.boards).all())
+        score = evaluate_bitboards(bitboards, 6, 7, 1)[2]
+        self.assertTrue((score == evaluate_batch(self.boards, 1)[2]).all())
+
+    def test_bitboards_too_big(self):
+        with self.assertRaises(ValueError):
+            bitboards_to_boards([[0, 0]], 8, 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
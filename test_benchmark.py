@@ -0,0 +1,51 @@
+import unittest
+from benchmark import load_corpus, compare, measure_position, ROWS, COLUMNS, DEFAULT_CORPUS
+from makefirst5moves import position_of
+
+
+def result(category, nodes, seconds):
+    return {'category': category, 'nodes': nodes, 'seconds': seconds,
+            'utility_us': 100.0, 'is_endgame_us': 10.0}
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_corpus(self):
+        corpus = load_corpus(DEFAULT_CORPUS)
+        self.assertEqual({category for category, moves in corpus},
+                         {'opening', 'middlegame', 'endgame'})
+        self.assertIn(('opening', ''), corpus)
+        for category, moves in corpus:
+            position = position_of(moves, ROWS, COLUMNS)
+            self.assertFalse(position.is_win(1) or position.is_win(2) or position.is_full())
+
+    def test_measure_position(self):
+        measures = measure_position('3324', 3, 1, 2)
+        self.assertGreater(measures['nodes'], 0)
+        self.assertGreater(measures['nps'], 0)
+        self.assertEqual(measure_position('3324', 3, 1, 2)['nodes'], measures['nodes'])
+
+    def test_compare(self):
+        baseline = {'33': result('opening', 100, 1.0), '3333': result('opening', 100, 1.0)}
+        same = {'33': result('opening', 100, 1.1), '3333': result('opening', 100, 1.0)}
+        self.assertEqual(compare(same, baseline, 0.25, 0), [])
+
+        more_nodes = {'33': result('opening', 101, 1.0), '3333': result('opening', 100, 1.0)}
+        regressions = compare(more_nodes, baseline, 0.25, 0)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('nodes', regressions[0])
+        self.assertEqual(compare(more_nodes, baseline, 0.25, 0.05), [])
+
+        slower = {'33': result('opening', 100, 1.5), '3333': result('opening', 100, 1.5)}
+        regressions = compare(slower, baseline, 0.25, 0)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('seconds', regressions[0])
+
+    def test_compare_new_positions(self):
+        baseline = {'33': result('opening', 100, 1.0)}
+        results = {'33': result('opening', 100, 1.0), '3333': result('opening', 500, 9.0)}
+        self.assertEqual(compare(results, baseline, 0.25, 0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
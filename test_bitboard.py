@@ -0,0 +1,114 @@
+import unittest
+import numpy as np
+from bitboard import Position
+
+
+class TestPosition(unittest.TestCase):
+
+    def setUp(self):
+        self.board = [
+            [0, 2, 1, 1, 2, 0, 0],
+            [0, 1, 2, 2, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ]
+        self.position = Position.from_status(self.board, 6, 7)
+
+    def test_from_status(self):
+        self.assertEqual(self.position.count, 8)
+        self.assertEqual(self.position.to_status(), self.board)
+
+    def test_from_numpy_status(self):
+        position = Position.from_status(np.array(self.board, dtype=float), 6, 7)
+        self.assertEqual(position.bitboards, self.position.bitboards)
+
+    def test_actions(self):
+        self.assertEqual(self.position.actions(), list(range(7)))
+        for _ in range(6):
+            self.position.play(0, 1)
+        self.assertFalse(self.position.can_play(0))
+        self.assertEqual(self.position.actions(), list(range(1, 7)))
+
+    def test_play_undo(self):
+        bitboards = list(self.position.bitboards)
+        mask = self.position.mask
+        key = self.position.key
+        self.position.play(2, 2)
+        self.assertNotEqual(self.position.key, key)
+        self.assertEqual(self.position.to_status()[3][2], 2)
+        self.position.undo()
+        self.assertEqual(self.position.bitboards, bitboards)
+        self.assertEqual(self.position.mask, mask)
+        self.assertEqual(self.position.key, key)
+        self.assertEqual(self.position.to_status(), self.board)
+
+    def test_key_transposition(self):
+        position = Position(6, 7)
+        for col, piece in ((3, 1), (4, 2), (2, 1)):
+            position.play(col, piece)
+        other = Position(6, 7)
+        for col, piece in ((2, 1), (4, 2), (3, 1)):
+            other.play(col, piece)
+        self.assertEqual(position.key, other.key)
+
+    def test_canonical_key(self):
+        position = Position(6, 7)
+        mirror = Position(6, 7)
+        for col, piece in ((3, 1), (1, 2), (2, 1)):
+            position.play(col, piece)
+            mirror.play(6 - col, piece)
+        self.assertEqual(position.key, mirror.mirror_key)
+        self.assertEqual(position.canonical_key()[0], mirror.canonical_key()[0])
+        self.assertNotEqual(position.canonical_key()[1], mirror.canonical_key()[1])
+        symmetric = Position(6, 7)
+        symmetric.play(3, 1)
+        self.assertEqual(symmetric.canonical_key(), (symmetric.key, False))
+
+    def test_is_win(self):
+        # vertical, horizontal and both diagonals
+        lines = [
+            [(0, 0), (1, 0), (2, 0), (3, 0)],
+            [(0, 3), (0, 4), (0, 5), (0, 6)],
+            [(2, 2), (3, 3), (4, 4), (5, 5)],
+            [(5, 0), (4, 1), (3, 2), (2, 3)]
+        ]
+        for line in lines:
+            board = [[0] * 7 for _ in range(6)]
+            for r, c in line:
+                for below in range(r + 1):
+                    if board[below][c] == 0:
+                        board[below][c] = 1
+                board[r][c] = 2
+            position = Position.from_status(board, 6, 7)
+            self.assertTrue(position.is_win(2))
+        self.assertFalse(self.position.is_win(1))
+        self.assertFalse(self.position.is_win(2))
+
+    def test_no_wrap_around(self):
+        # pieces at the top of a column and the bottom of the next one
+        position = Position(6, 7)
+        for _ in range(4):
+            position.play(0, 2)
+        position.undo()
+        position.play(0, 1)
+        position.play(0, 1)
+        position.play(0, 1)
+        position.play(1, 1)
+        self.assertFalse(position.is_win(1))
+
+    def test_is_full(self):
+        position = Position(6, 7)
+        for c in range(7):
+            for r in range(6):
+                position.play(c, 1 + (r + c // 2) % 2)
+        self.assertTrue(position.is_full())
+        self.assertEqual(position.actions(), [])
+
+    def test_window_masks(self):
+        self.assertEqual(len(self.position.window_masks()), 69)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import random
+import numpy as np
+from board import Board
+
+
+def has_four(status, player):
+    """Brute force search of four pieces of player in a row."""
+    rows, columns = status.shape
+    for r in range(rows):
+        for c in range(columns):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + i * dr, c + i * dc) for i in range(4)]
+                if all(0 <= rr < rows and 0 <= cc < columns and status[rr][cc] == player
+                       for rr, cc in cells):
+                    return True
+    return False
+
+
+class TestBoard(unittest.TestCase):
+
+    def test_insert_piece(self):
+        board = Board(6, 7)
+        self.assertIsNone(board.last_move)
+        board.insert_piece(0, 3, 1)
+        self.assertEqual(board.status[0][3], 1)
+        self.assertEqual(board.last_move, (0, 3, 1))
+        self.assertIsNone(board.position)
+
+    def test_is_winning_position(self):
+        rng = random.Random(17)
+        for bitboard in (False, True):
+            for _ in range(30):
+                board = Board(6, 7, bitboard)
+                piece = 1
+                while any(board.is_valid_location(c) for c in range(7)):
+                    col = rng.choice([c for c in range(7) if board.is_valid_location(c)])
+                    board.insert_piece(board.get_next_open_row(col), col, piece)
+                    for player in (1, 2):
+                        self.assertEqual(board.is_winning_position(player),
+                                         has_four(board.status, player))
+                    if board.is_winning_position(piece):
+                        break
+                    piece = 3 - piece
+                if bitboard:
+                    self.assertEqual(board.position.to_status(), board.status.tolist())
+
+    def test_status_setter(self):
+        status = np.zeros((6, 7))
+        status[0][0:4] = 2
+        for bitboard in (False, True):
+            board = Board(6, 7, bitboard)
+            board.insert_piece(0, 0, 1)
+            board.status = status.copy()
+            self.assertIsNone(board.last_move)
+            self.assertTrue(board.is_winning_position(2))
+            self.assertFalse(board.is_winning_position(1))
+            if bitboard:
+                self.assertEqual(board.position.count, 4)
+
+    def test_replace_piece(self):
+        for bitboard in (False, True):
+            board = Board(6, 7, bitboard)
+            for col in range(4):
+                board.insert_piece(0, col, 1)
+            self.assertTrue(board.is_winning_position(1))
+            board.insert_piece(0, 3, 0)
+            self.assertFalse(board.is_winning_position(1))
+            if bitboard:
+                self.assertEqual(board.position.count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
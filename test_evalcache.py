@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from ai import Minimax_AI
+from evalcache import EvaluationCache
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = EvaluationCache(memory_mb=0.001)
+
+    def test_size(self):
+        self.assertEqual(self.cache.size, 2 * (1048 // (2 * EvaluationCache.ENTRY_BYTES)))
+
+    def test_store_get(self):
+        self.assertIsNone(self.cache.get(12345))
+        self.cache.store(12345, -7)
+        self.assertEqual(self.cache.get(12345), -7)
+        self.assertEqual(self.cache.probes, 2)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.hit_rate, 0.5)
+        # 64 bits keys fit
+        self.cache.store(2**64 - 1, 1000)
+        self.assertEqual(self.cache.get(2**64 - 1), 1000)
+
+    def test_replacement(self):
+        sets = self.cache.size // 2
+        # the two slots of a set keep the two last keys
+        self.cache.store(1, 10)
+        self.cache.store(1 + sets, 20)
+        self.assertEqual(self.cache.get(1), 10)
+        self.assertEqual(self.cache.get(1 + sets), 20)
+        self.cache.store(1 + 2 * sets, 30)
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.get(1 + sets), 20)
+        self.assertEqual(self.cache.get(1 + 2 * sets), 30)
+
+    def test_clear(self):
+        self.cache.store(1, 10)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.probes, 1)
+
+    def test_search_with_cache(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        cached = Minimax_AI(5, 2, 6, 7, book=None, eval_cache_mb=1, threat_value=4)
+        plain = Minimax_AI(5, 2, 6, 7, book=None, threat_value=4)
+        self.assertIsNone(plain.eval_cache)
+        self.assertEqual(cached.make_move(board), plain.make_move(board))
+        self.assertEqual(cached.nodes, plain.nodes)
+        self.assertGreater(cached.eval_cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
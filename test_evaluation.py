@@ -0,0 +1,57 @@
+import unittest
+import random
+import numpy as np
+from ai import Minimax_AI
+from bitboard import Position
+from evaluation import IncrementalEvaluator, window_value
+
+
+class TestIncrementalEvaluator(unittest.TestCase):
+
+    def test_window_value(self):
+        self.assertEqual(window_value(3, 0), 5)
+        self.assertEqual(window_value(2, 0), 2)
+        self.assertEqual(window_value(0, 3), -5)
+        self.assertEqual(window_value(0, 2), -2)
+        self.assertEqual(window_value(2, 1), 0)
+        self.assertEqual(window_value(1, 0), 0)
+
+    def test_same_value_as_utility(self):
+        rng = random.Random(5)
+        for player in (1, 2):
+            ai = Minimax_AI(4, player, 6, 7)
+            evaluator = IncrementalEvaluator(6, 7, player)
+            for _ in range(100):
+                position = Position(6, 7)
+                evaluator.reset(position)
+                piece = 1
+                for _ in range(rng.randrange(42)):
+                    col = rng.choice(position.actions())
+                    evaluator.play(position.heights[col], piece)
+                    position.play(col, piece)
+                    if position.is_win(piece) or position.is_full():
+                        evaluator.undo(position.heights[col] - 1, piece)
+                        position.undo()
+                        break
+                    piece = 3 - piece
+                board = np.array(position.to_status())
+                self.assertEqual(evaluator.score, ai._utility(board))
+
+    def test_undo(self):
+        position = Position(6, 7)
+        evaluator = IncrementalEvaluator(6, 7, 1)
+        moves = [(3, 1), (3, 2), (4, 1), (2, 2), (5, 1)]
+        scores = [evaluator.score]
+        for col, piece in moves:
+            evaluator.play(position.heights[col], piece)
+            position.play(col, piece)
+            scores.append(evaluator.score)
+        for col, piece in reversed(moves):
+            scores.pop()
+            position.undo()
+            evaluator.undo(position.heights[col], piece)
+            self.assertEqual(evaluator.score, scores[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
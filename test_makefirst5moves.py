@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from makefirst5moves import enumerate_positions, load_checkpoint, position_of
+
+
+class TestBookBuilder(unittest.TestCase):
+
+    def test_enumerate_positions(self):
+        positions = enumerate_positions(6, 7, 2)
+        self.assertEqual(positions[0], '')
+        # 4 first moves up to symmetry, 7 replies to the center one
+        # and 7 to each of the other three, up to symmetry for the center
+        self.assertEqual(len([m for m in positions if len(m) == 1]), 4)
+        self.assertEqual(len(positions), 1 + 4 + 25)
+        self.assertNotIn('4', positions)
+
+    def test_game_over_positions(self):
+        positions = enumerate_positions(6, 7, 7)
+        self.assertNotIn('0101010', positions)
+        self.assertIn('010101', positions)
+
+    def test_position_of(self):
+        position = position_of('33', 6, 7)
+        self.assertEqual(position.to_status()[0][3], 1)
+        self.assertEqual(position.to_status()[1][3], 2)
+
+    def test_load_checkpoint(self):
+        handle, path = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as file:
+            file.write('- 3\n33 2\n334')
+        self.assertEqual(load_checkpoint(path), {'': 3, '33': 2})
+        os.remove(path)
+        self.assertEqual(load_checkpoint(path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
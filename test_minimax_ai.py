@@ -1,6 +1,24 @@
 import unittest
+import random
+import time
 import numpy as np
-from ai import Minimax_AI
+from ai import Minimax_AI, Solver
+from bitboard import Position
+
+
+def random_position(rng, pieces):
+    """Returns a random position with pieces in the board where the game
+    is not over, and the player to move."""
+    while True:
+        position = Position(6, 7)
+        piece = 1
+        for _ in range(pieces):
+            position.play(rng.choice(position.actions()), piece)
+            piece = 3 - piece
+            if position.is_win(1) or position.is_win(2):
+                break
+        else:
+            return position, piece
 
 
 class TestAI(unittest.TestCase):
@@ -272,6 +290,334 @@ class TestAI(unittest.TestCase):
         self.assertEqual(self.ai._utility(vertical_test), -2)
         self.assertEqual(self.ai._utility(slope_test), -3)
 
+    def test_evaluate(self):
+        rng = random.Random(4)
+        for _ in range(200):
+            position = Position(6, 7)
+            piece = 1
+            for _ in range(rng.randrange(43)):
+                if position.is_win(1) or position.is_win(2) or position.is_full():
+                    break
+                position.play(rng.choice(position.actions()), piece)
+                piece = 3 - piece
+            board = np.array(position.to_status())
+            self.assertEqual(self.ai._evaluate(position), self.ai._utility(board))
+
+    def test_search_matches_minimax(self):
+        board = np.array([
+            [0, 2, 1, 1, 2, 0, 0],
+            [0, 1, 2, 2, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        ai = Minimax_AI(3, 2, 6, 7)
+        value, col = ai._minimax(board, 1, True, float('-inf'), float('inf'), 0)
+        position = Position.from_status(board, 6, 7)
+        ai._evaluator.reset(position)
+        self.assertEqual(ai._search(position, 2, True, float('-inf'), float('inf'))[0], value)
+        # the second search is answered by the transposition table
+        probes = ai.table.probes
+        self.assertEqual(ai._search(position, 2, True, float('-inf'), float('inf'))[0], value)
+        self.assertEqual(ai.table.probes, probes + 1)
+
+    def test_search_threats_match_minimax(self):
+        # the threat pruning must not change the values of random positions
+        rng = random.Random(22)
+        for _ in range(20):
+            position, piece = random_position(rng, rng.randrange(8, 30))
+            board = np.array(position.to_status())
+            ai = Minimax_AI(3, piece, 6, 7, book=None)
+            value, col = ai._minimax(board, 0, True, float('-inf'), float('inf'), 0)
+            ai._evaluator.reset(position)
+            self.assertEqual(ai._search(position, 3, True, float('-inf'), float('inf'))[0], value)
+
+    def test_search_threats(self):
+        board = np.array([
+            [1, 1, 1, 0, 2, 2, 0],
+            [2, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        position = Position.from_status(board, 6, 7)
+        # player 2 blocks the only threat of player 1
+        ai = Minimax_AI(4, 2, 6, 7, book=None)
+        ai._evaluator.reset(position)
+        self.assertEqual(ai._search(position, 4, True, float('-inf'), float('inf'))[1], 3)
+        # player 1 wins without searching the other moves
+        ai = Minimax_AI(4, 1, 6, 7, book=None)
+        ai._evaluator.reset(position)
+        self.assertEqual(ai._search(position, 4, True, float('-inf'), float('inf')), (1000, 3))
+        self.assertEqual(ai.nodes, 1)
+        # two threats of player 1 can not be blocked
+        board = np.array([
+            [1, 1, 1, 0, 2, 2, 1],
+            [2, 2, 0, 0, 2, 0, 1],
+            [0, 0, 0, 0, 0, 0, 1],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        position = Position.from_status(board, 6, 7)
+        ai = Minimax_AI(4, 2, 6, 7, book=None)
+        ai._evaluator.reset(position)
+        self.assertEqual(ai._search(position, 4, True, float('-inf'), float('inf'))[0], -1000)
+
+    def test_threat_value(self):
+        board = np.array([
+            [1, 1, 1, 0, 2, 2, 0],
+            [2, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        position = Position.from_status(board, 6, 7)
+        # the threat of player 1 is in the first row, one of its rows
+        self.assertEqual(Minimax_AI(4, 1, 6, 7, threat_value=4)._threat_score(position), 4)
+        self.assertEqual(Minimax_AI(4, 2, 6, 7, threat_value=4)._threat_score(position), -4)
+        board[0][3] = 2
+        board[1][3] = 1
+        position = Position.from_status(board, 6, 7)
+        self.assertEqual(Minimax_AI(4, 1, 6, 7, threat_value=4)._threat_score(position), 0)
+
+    def test_pvs_matches_full_window(self):
+        rng = random.Random(24)
+        for _ in range(10):
+            position, piece = random_position(rng, rng.randrange(4, 20))
+            values = []
+            for pvs, window in ((False, 0), (True, 0), (True, 4)):
+                ai = Minimax_AI(5, piece, 6, 7, book=None, pvs=pvs, aspiration_window=window)
+                ai._evaluator.reset(position)
+                previous = ai._search_window(position, 4, None)[0]
+                values.append(ai._search_window(position, 5, previous)[0])
+            self.assertEqual(values[0], values[1])
+            self.assertEqual(values[0], values[2])
+
+    def test_principal_variation(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        for time_limit_ms in (None, 100):
+            ai = Minimax_AI(6, 2, 6, 7, book=None)
+            col = ai.make_move(board, time_limit_ms)
+            variation = ai.principal_variation
+            self.assertEqual(variation[0], col)
+            self.assertEqual(ai.value, ai.table.peek(Position.from_status(board, 6, 7).canonical_key()[0])[2])
+            self.assertLessEqual(len(variation), ai.searched_depth)
+            # every move of the line can be played
+            position = Position.from_status(board, 6, 7)
+            for turn, move in enumerate(variation):
+                self.assertTrue(position.can_play(move))
+                position.play(move, 2 - turn % 2)
+        # a move of the book is the whole line
+        ai = Minimax_AI(6, 2, 6, 7)
+        self.assertEqual(ai.principal_variation, [])
+        col = ai.make_move(board)
+        self.assertEqual(ai.principal_variation, [col])
+        self.assertIsNone(ai.value)
+
+    def test_search_is_deterministic(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        ai1 = Minimax_AI(5, 2, 6, 7, book=None)
+        ai2 = Minimax_AI(5, 2, 6, 7, book=None)
+        self.assertEqual(ai1.make_move(board), ai2.make_move(board))
+        self.assertEqual(ai1._nodes, ai2._nodes)
+
+    def test_search_mirror(self):
+        board = np.array([
+            [0, 2, 1, 1, 2, 0, 0],
+            [0, 1, 2, 2, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        ai = Minimax_AI(5, 2, 6, 7, book=None)
+        col = ai.make_move(board)
+        hits = ai.table.hits
+        # the mirrored board is answered by the entry of the first search
+        self.assertEqual(ai.make_move(np.fliplr(board)), 6 - col)
+        self.assertEqual(ai.nodes, 1)
+        self.assertEqual(ai.table.hits, hits + 1)
+
+    def test_parallel_search(self):
+        board = np.array([
+            [0, 2, 1, 1, 2, 0, 0],
+            [0, 1, 2, 2, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        sequential = Minimax_AI(5, 2, 6, 7)
+        parallel = Minimax_AI(5, 2, 6, 7, workers=2)
+        try:
+            position = Position.from_status(board, 6, 7)
+            sequential._evaluator.reset(position)
+            parallel._evaluator.reset(position)
+            self.assertEqual(
+                parallel._search_parallel(position, 5),
+                sequential._search(position, 5, True, float('-inf'), float('inf')))
+            self.assertEqual(position.to_status(), board.tolist())
+        finally:
+            parallel.close()
+
+    def test_parallel_same_move(self):
+        # the parallel root must cut the moves like _search, or it can play
+        # a slower win, or another losing move than the forced block
+        rng = random.Random(7)
+        parallel = {player: Minimax_AI(4, player, 6, 7, book=None, solver_cells=0, workers=2)
+                    for player in (1, 2)}
+        wins = 0
+        try:
+            for _ in range(40):
+                position, piece = random_position(rng, rng.randrange(6, 30))
+                if position.winning_cells(piece) & position.playable_cells():
+                    wins += 1
+                board = np.array(position.to_status())
+                sequential = Minimax_AI(4, piece, 6, 7, book=None, solver_cells=0)
+                self.assertEqual(parallel[piece].make_move(board), sequential.make_move(board))
+        finally:
+            for ai in parallel.values():
+                ai.close()
+        self.assertGreater(wins, 0)
+
+    def test_make_move_wins(self):
+        board = np.array([
+            [1, 2, 2, 2, 0, 1, 0],
+            [0, 1, 1, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        self.assertEqual(self.ai.make_move(board), 4)
+
+    def test_make_move_time_limit(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        board[1][3] = 2
+        board[0][2] = 1
+        ai = Minimax_AI(4, 2, 6, 7, book=None)
+        start = time.perf_counter()
+        col = ai.make_move(board, time_limit_ms=200)
+        elapsed = time.perf_counter() - start
+        self.assertIn(col, range(7))
+        self.assertGreaterEqual(ai.searched_depth, 1)
+        self.assertLess(elapsed, 1)
+
+    def test_make_move_time_limit_wins(self):
+        board = np.array([
+            [1, 2, 2, 2, 0, 1, 0],
+            [0, 1, 1, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        self.assertEqual(self.ai.make_move(board, time_limit_ms=1000), 4)
+
+
+    def test_ponder_hit(self):
+        board = np.zeros((6, 7))
+        for index, col in enumerate([3, 3, 2, 4, 2]):
+            board[int((board[:, col] != 0).sum())][col] = 1 + index % 2
+        ai = Minimax_AI(5, 2, 6, 7, book=None, solver_cells=0)
+        col = ai.make_move(board)
+        board[int((board[:, col] != 0).sum())][col] = 2
+        ai.ponder(board)
+        ai._ponder_thread.join()
+        self.assertFalse(ai.pondering)
+        for reply in range(7):
+            after = board.copy()
+            after[int((after[:, reply] != 0).sum())][reply] = 1
+            if ai._is_endgame(after, 1):
+                continue
+            ai.make_move(after)
+            # the root is in the table, no search is needed
+            self.assertEqual(ai.nodes, 1)
+
+    def test_ponder_stop(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        board[1][3] = 2
+        ai = Minimax_AI(12, 2, 6, 7, book=None)
+        ai.ponder(board)
+        self.assertTrue(ai.pondering)
+        time.sleep(0.05)
+        start = time.perf_counter()
+        ai.stop_pondering()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertFalse(ai.pondering)
+        board[0][2] = 1
+        ai._depth = 4
+        self.assertIn(ai.make_move(board), range(7))
+
+    def test_ponder_keeps_move_counters(self):
+        board = np.zeros((6, 7))
+        board[0][3] = 1
+        ai = Minimax_AI(6, 2, 6, 7, book=None, stats=True)
+        col = ai.make_move(board)
+        nodes = ai.nodes
+        stats = ai.stats.to_dict()
+        board[0][col] = 2
+        ai.ponder(board)
+        time.sleep(0.3)
+        # the counters describe the last move while the thread runs
+        self.assertEqual(ai.nodes, nodes)
+        self.assertEqual(ai.stats.to_dict(), stats)
+        ai.stop_pondering()
+        self.assertEqual(ai.nodes, nodes)
+        self.assertEqual(ai.stats.to_dict(), stats)
+        self.assertEqual(ai.stats.cutoffs, stats['iterations'][-1]['cutoffs'])
+
+class TestSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.solver = Solver(6, 7)
+
+    def brute_force(self, position, piece):
+        best = None
+        for col in position.actions():
+            position.play(col, piece)
+            if position.is_win(piece):
+                score = (42 + 2 - position.count) // 2
+            elif position.is_full():
+                score = 0
+            else:
+                score = -self.brute_force(position, 3 - piece)
+            position.undo()
+            best = score if best is None else max(best, score)
+        return best
+
+    def test_solve(self):
+        rng = random.Random(11)
+        for _ in range(20):
+            position, piece = random_position(rng, 32)
+            self.assertEqual(self.solver.solve(position, piece),
+                             self.brute_force(position, piece))
+
+    def test_best_move(self):
+        rng = random.Random(12)
+        for _ in range(10):
+            position, piece = random_position(rng, 32)
+            col, score = self.solver.best_move(position, piece)
+            self.assertEqual(score, self.solver.solve(position, piece))
+            position.play(col, piece)
+            if not position.is_win(piece):
+                self.assertEqual(-self.solver.solve(position, 3 - piece), score)
+
+    def test_make_move_uses_solver(self):
+        rng = random.Random(13)
+        position, piece = random_position(rng, 26)
+        ai = Minimax_AI(1, piece, 6, 7, book=None)
+        col = ai.make_move(np.array(position.to_status()))
+        self.assertEqual(col, self.solver.best_move(position, piece)[0])
+
 
 if __name__ == '__main__':
     unittest.main()
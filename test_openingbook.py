@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from bitboard import Position
+from openingbook import OpeningBook, book_path, canonical_key, get_book
+
+
+def position_of(moves):
+    position = Position(6, 7)
+    for index, col in enumerate(moves):
+        position.play(col, 1 + index % 2)
+    return position
+
+
+class TestOpeningBook(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        entries = [
+            (position_of([]), 1, 3),
+            (position_of([1]), 2, 2),
+            (position_of([3, 3]), 1, 4),
+        ]
+        OpeningBook.write(self.path, 6, 7, entries)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        os.remove(self.path)
+
+    def test_header(self):
+        self.assertEqual((self.book.rows, self.book.columns), (6, 7))
+        self.assertEqual(self.book.max_ply, 2)
+        self.assertEqual(self.book.size, 3)
+
+    def test_lookup(self):
+        self.assertEqual(self.book.lookup(position_of([]), 1), 3)
+        self.assertEqual(self.book.lookup(position_of([1]), 2), 2)
+        self.assertEqual(self.book.lookup(position_of([3, 3]), 1), 4)
+        self.assertIsNone(self.book.lookup(position_of([1]), 1))
+        self.assertIsNone(self.book.lookup(position_of([2]), 2))
+        self.assertIsNone(self.book.lookup(position_of([3, 3, 3]), 2))
+
+    def test_mirror(self):
+        self.assertEqual(self.book.lookup(position_of([5]), 2), 4)
+        self.assertEqual(self.book.lookup(position_of([3, 3]), 1), 4)
+        self.assertEqual(canonical_key(position_of([5]), 2)[0],
+                         canonical_key(position_of([1]), 2)[0])
+
+    def test_not_a_book(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\0' * 32)
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_repository_book(self):
+        book = OpeningBook(book_path())
+        self.assertEqual(book.lookup(Position(6, 7), 1), 3)
+        book.close()
+
+
+class TestGetBook(unittest.TestCase):
+
+    def test_shared(self):
+        self.assertIs(get_book(), get_book('openingbook.bin'))
+        self.assertIs(get_book(), get_book(book_path('openingbook.bin')))
+
+    def test_other_directory(self):
+        directory = os.getcwd()
+        os.chdir(tempfile.gettempdir())
+        try:
+            from ai import Minimax_AI
+            first = Minimax_AI(4, 1, 6, 7)
+            second = Minimax_AI(4, 2, 6, 7)
+        finally:
+            os.chdir(directory)
+        self.assertIs(first.book, second.book)
+        self.assertEqual(first.book.lookup(Position(6, 7), 1), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
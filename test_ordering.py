@@ -0,0 +1,50 @@
+import unittest
+from bitboard import Position
+from ordering import MoveOrderer
+
+
+class TestMoveOrderer(unittest.TestCase):
+
+    def setUp(self):
+        self.orderer = MoveOrderer(6, 7)
+        self.position = Position(6, 7)
+
+    def test_center_first(self):
+        self.assertEqual(self.orderer.order(self.position, 1, None),
+                         [3, 2, 4, 1, 5, 0, 6])
+
+    def test_full_columns(self):
+        for _ in range(6):
+            self.position.play(3, 1)
+        self.assertEqual(self.orderer.order(self.position, 1, None),
+                         [2, 4, 1, 5, 0, 6])
+
+    def test_table_move_and_killers(self):
+        self.orderer.cutoff(self.position, 1, 5, 2)
+        self.orderer.cutoff(self.position, 1, 0, 2)
+        self.assertEqual(self.orderer.order(self.position, 1, 6),
+                         [6, 0, 5, 3, 2, 4, 1])
+
+    def test_history(self):
+        position = Position(6, 7)
+        position.play(3, 1)
+        self.orderer.cutoff(position, 2, 1, 4)
+        # the killers of another number of pieces do not apply
+        self.assertEqual(self.orderer.order(self.position, 2, None)[0], 1)
+        self.assertEqual(self.orderer.order(self.position, 1, None)[0], 3)
+        self.orderer.new_search()
+        self.assertEqual(self.orderer.order(self.position, 2, None)[0], 1)
+
+    def test_seed(self):
+        orders = set()
+        for seed in range(20):
+            orderer = MoveOrderer(6, 7, seed)
+            order = orderer.order(self.position, 1, None)
+            self.assertEqual(order[0], 3)
+            self.assertEqual(order, MoveOrderer(6, 7, seed).order(self.position, 1, None))
+            orders.add(tuple(order))
+        self.assertGreater(len(orders), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
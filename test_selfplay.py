@@ -0,0 +1,53 @@
+import unittest
+import tempfile
+import numpy as np
+from selfplay import (game_records, selfplay_records, write_chunks, load_chunks,
+                      record_dtype)
+
+
+class TestSelfplay(unittest.TestCase):
+
+    def test_game_records(self):
+        records = list(game_records(25, 2, opening_plies=2))
+        self.assertEqual(records, list(game_records(25, 2, opening_plies=2)))
+        self.assertGreater(len(records), 0)
+        for board, to_move, ply, score, move, outcome in records:
+            self.assertEqual(sum(cell != 0 for row in board for cell in row), ply)
+            self.assertEqual(to_move, 1 + ply % 2)
+            self.assertGreaterEqual(ply, 2)
+            # the column of the move has space
+            self.assertEqual(board[-1][move], 0)
+            self.assertIn(outcome, (-1, 0, 1))
+        # the two players get opposite outcomes
+        player1_outcomes = {outcome if to_move == 1 else -outcome
+                            for board, to_move, ply, score, move, outcome in records}
+        self.assertEqual(len(player1_outcomes), 1)
+        # the last move of a won game is the winning one
+        board, to_move, ply, score, move, outcome = records[-1]
+        if outcome != 0:
+            self.assertEqual(outcome, 1)
+
+    def test_write_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            total = write_chunks(selfplay_records(3, depth=2), directory, chunk_size=16)
+            chunks = load_chunks(directory)
+            self.assertEqual(sum(len(chunk) for chunk in chunks), total)
+            self.assertTrue(all(len(chunk) == 16 for chunk in chunks[:-1]))
+            self.assertIsInstance(chunks[0], np.memmap)
+            self.assertEqual(chunks[0].dtype, record_dtype(6, 7))
+            expected = list(selfplay_records(3, depth=2))
+            first = chunks[0][0]
+            self.assertEqual(first['board'].tolist(), expected[0][0])
+            self.assertEqual(first['score'], expected[0][3])
+            # a second run adds chunks after the first ones
+            write_chunks(selfplay_records(1, seed=1, depth=2), directory, chunk_size=16)
+            self.assertGreater(len(load_chunks(directory)), len(chunks))
+
+    def test_workers(self):
+        sequential = list(selfplay_records(4, depth=2))
+        parallel = list(selfplay_records(4, depth=2, workers=2))
+        self.assertEqual(sorted(map(repr, parallel)), sorted(map(repr, sequential)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import asyncio
+import numpy as np
+from service import MoveService
+
+
+class TestMoveService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = MoveService(4, 6, 7, workers=0)
+        # player 2 to move wins in column 4, player 1 to move blocks it
+        self.board = np.array([
+            [1, 2, 2, 2, 0, 1, 0],
+            [0, 1, 1, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_make_moves(self):
+        self.assertEqual(self.service.make_moves([self.board, self.board]), [4, 4])
+        self.assertEqual(self.service.make_moves([self.board], [2]), [4])
+
+    def test_make_move_async(self):
+        async def play():
+            return await asyncio.gather(self.service.make_move(self.board),
+                                        self.service.make_move(self.board, 2))
+        self.assertEqual(asyncio.run(play()), [4, 4])
+
+    def test_process_pool(self):
+        service = MoveService(4, 6, 7, workers=2)
+        try:
+            self.assertEqual(service.make_moves([self.board] * 3), [4, 4, 4])
+        finally:
+            service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
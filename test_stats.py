@@ -0,0 +1,104 @@
+import unittest
+import io
+import json
+import numpy as np
+from ai import Minimax_AI
+from bitboard import Position
+from stats import SearchStats
+
+
+def board_of(moves):
+    board = np.zeros((6, 7))
+    for index, col in enumerate(moves):
+        board[int((board[:, col] != 0).sum())][col] = 1 + index % 2
+    return board
+
+
+class TestSearchStats(unittest.TestCase):
+
+    def test_disabled(self):
+        ai = Minimax_AI(4, 2, 6, 7, book=None)
+        ai.make_move(board_of([3, 3, 2]))
+        self.assertIsNone(ai.stats)
+
+    def test_fixed_depth(self):
+        ai = Minimax_AI(5, 2, 6, 7, book=None, stats=True)
+        col = ai.make_move(board_of([3, 3, 2]))
+        stats = ai.stats
+        self.assertEqual(stats.move, col)
+        self.assertEqual(stats.source, 'search')
+        self.assertEqual(stats.principal_variation, ai.principal_variation)
+        self.assertEqual(stats.to_dict()['principal_variation'][0], col)
+        self.assertEqual(stats.pieces, 3)
+        self.assertEqual(stats.nodes, ai.nodes)
+        self.assertEqual(len(stats.iterations), 1)
+        iteration = stats.iterations[0]
+        self.assertEqual(iteration['depth'], 5)
+        self.assertEqual(iteration['nodes'], ai.nodes)
+        self.assertGreater(iteration['cutoffs'], 0)
+        self.assertLessEqual(iteration['first_move_cutoffs'], iteration['cutoffs'])
+        self.assertTrue(0 <= iteration['first_move_cutoff_rate'] <= 1)
+        self.assertGreater(iteration['table_probes'], 0)
+        self.assertTrue(0 <= iteration['table_hit_rate'] <= 1)
+        self.assertGreater(iteration['nps'], 0)
+
+    def test_first_move_after_unsafe(self):
+        # column 3, the first in order, lets player 1 win on top of it
+        board = np.zeros((6, 7))
+        board[0][:5] = [2, 1, 2, 0, 1]
+        board[1][:3] = [1, 1, 1]
+        position = Position.from_status(board, 6, 7)
+        ai = Minimax_AI(2, 2, 6, 7, book=None)
+        self.assertEqual(ai._orderer.order(position, 2, None)[0], 3)
+        ai._evaluator.reset(position)
+        ai._stats = SearchStats(2, position.count)
+        # any value is above beta, the first move searched is a cutoff
+        value, col = ai._search(position, 2, True, float('-inf'), -500)
+        self.assertNotEqual(col, 3)
+        self.assertEqual(ai._stats.cutoffs, 1)
+        self.assertEqual(ai._stats.first_move_cutoffs, 1)
+
+    def test_same_move_as_without_stats(self):
+        board = board_of([3, 3, 2, 4])
+        with_stats = Minimax_AI(5, 1, 6, 7, book=None, stats=True)
+        without_stats = Minimax_AI(5, 1, 6, 7, book=None)
+        self.assertEqual(with_stats.make_move(board), without_stats.make_move(board))
+        self.assertEqual(with_stats.nodes, without_stats.nodes)
+
+    def test_iterations(self):
+        ai = Minimax_AI(4, 2, 6, 7, book=None, stats=True)
+        ai.make_move(board_of([3, 3, 2]), time_limit_ms=200)
+        depths = [iteration['depth'] for iteration in ai.stats.iterations]
+        self.assertEqual(depths, list(range(1, len(depths) + 1)))
+        completed = [iteration for iteration in ai.stats.iterations if iteration['completed']]
+        self.assertEqual(len(completed), ai.searched_depth)
+        self.assertEqual(sum(iteration['nodes'] for iteration in ai.stats.iterations),
+                         ai.stats.nodes)
+
+    def test_json_lines(self):
+        output = io.StringIO()
+        ai = Minimax_AI(3, 1, 6, 7, stats_file=output)
+        ai.make_move(board_of([]))
+        ai.make_move(board_of([3, 3, 2, 2, 4, 4, 0, 1, 6, 5]))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        moves = [json.loads(line) for line in lines]
+        self.assertEqual(moves[0]['source'], 'book')
+        self.assertEqual(moves[0]['iterations'], [])
+        self.assertEqual(moves[1]['source'], 'search')
+        self.assertEqual(moves[1]['iterations'][0]['depth'], 3)
+        self.assertNotIn('eval_cache_probes', moves[1]['iterations'][0])
+
+    def test_eval_cache(self):
+        output = io.StringIO()
+        ai = Minimax_AI(5, 2, 6, 7, book=None, eval_cache_mb=1, stats_file=output)
+        ai.make_move(board_of([3]))
+        iteration = json.loads(output.getvalue())['iterations'][0]
+        self.assertEqual(iteration['eval_cache_probes'], ai.eval_cache.probes)
+        self.assertEqual(iteration['eval_cache_hits'], ai.eval_cache.hits)
+        self.assertGreater(iteration['eval_cache_hits'], 0)
+        self.assertTrue(0 < iteration['eval_cache_hit_rate'] <= 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import random
+import numpy as np
+from ai import Minimax_AI
+from batch_evaluation import evaluate_batch
+from bitboard import Position
+from evaluation import IncrementalEvaluator
+from tables import EvaluationTables
+
+SHAPES = [(6, 7, 4), (7, 8, 4), (6, 7, 5), (6, 7, 3)]
+
+
+def random_position(rng, rows, columns, connect):
+    """Returns a random position where the game is not over."""
+    position = Position(rows, columns, connect)
+    piece = 1
+    for _ in range(rng.randrange(rows * columns)):
+        col = rng.choice(position.actions())
+        position.play(col, piece)
+        if position.is_win(piece) or position.is_full():
+            position.undo()
+            break
+        piece = 3 - piece
+    return position
+
+
+def has_line(board, rows, columns, connect, piece):
+    """Brute force search of connect pieces in a row."""
+    for r in range(rows):
+        for c in range(columns):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + i * dr, c + i * dc) for i in range(connect)]
+                if all(0 <= rr < rows and 0 <= cc < columns and board[rr][cc] == piece
+                       for rr, cc in cells):
+                    return True
+    return False
+
+
+class TestEvaluationTables(unittest.TestCase):
+
+    def test_shared(self):
+        self.assertIs(EvaluationTables.get(6, 7), EvaluationTables.get(6, 7, 4))
+        self.assertIsNot(EvaluationTables.get(6, 7, 4), EvaluationTables.get(6, 7, 5))
+
+    def test_number_of_lines(self):
+        self.assertEqual(len(EvaluationTables.get(6, 7, 4).lines), 69)
+        self.assertEqual(len(EvaluationTables.get(7, 8, 4).lines), 107)
+        # 3x6 horizontal, 7x2 vertical, 2x3 for every diagonal
+        self.assertEqual(len(EvaluationTables.get(6, 7, 5).lines), 18 + 14 + 6 + 6)
+
+    def test_cell_lines(self):
+        tables = EvaluationTables.get(6, 7, 5)
+        for bit, lines in enumerate(tables.cell_lines):
+            for index, mask in enumerate(tables.line_masks):
+                self.assertEqual(index in lines, bool(mask >> bit & 1))
+
+    def test_threat_masks(self):
+        tables = EvaluationTables.get(6, 7, 4)
+        board_mask = sum(((1 << 6) - 1) << (c * tables.stride) for c in range(7))
+        self.assertEqual(tables.threat_masks[1] | tables.threat_masks[2], board_mask)
+        self.assertEqual(tables.threat_masks[1] & tables.threat_masks[2], 0)
+        # bottom cell of column 2 for player 1, the one above for player 2
+        self.assertTrue(tables.threat_masks[1] >> (2 * tables.stride) & 1)
+        self.assertTrue(tables.threat_masks[2] >> (2 * tables.stride + 1) & 1)
+
+    def test_is_win(self):
+        rng = random.Random(14)
+        for rows, columns, connect in SHAPES:
+            for _ in range(50):
+                position = Position(rows, columns, connect)
+                for _ in range(rng.randrange(rows * columns)):
+                    position.play(rng.choice(position.actions()), rng.choice((1, 2)))
+                board = position.to_status()
+                for piece in (1, 2):
+                    self.assertEqual(position.is_win(piece),
+                                     has_line(board, rows, columns, connect, piece))
+
+    def test_winning_cells(self):
+        rng = random.Random(15)
+        for rows, columns, connect in SHAPES:
+            for _ in range(30):
+                position = random_position(rng, rows, columns, connect)
+                board = position.to_status()
+                for piece in (1, 2):
+                    expected = 0
+                    for c in range(columns):
+                        for r in range(rows):
+                            if board[r][c] == 0:
+                                board[r][c] = piece
+                                if has_line(board, rows, columns, connect, piece):
+                                    expected |= 1 << (c * (rows + 1) + r)
+                                board[r][c] = 0
+                    self.assertEqual(position.winning_cells(piece), expected)
+
+    def test_same_value_as_utility(self):
+        rng = random.Random(16)
+        for rows, columns, connect in SHAPES:
+            ai = Minimax_AI(2, 1, rows, columns, book=None, connect=connect)
+            evaluator = IncrementalEvaluator(rows, columns, 1, connect)
+            positions = [random_position(rng, rows, columns, connect) for _ in range(30)]
+            boards = np.array([position.to_status() for position in positions])
+            _, _, scores = evaluate_batch(boards, 1, connect)
+            for position, board, score in zip(positions, boards, scores):
+                evaluator.reset(position)
+                self.assertEqual(evaluator.score, ai._utility(board))
+                self.assertEqual(ai._evaluate(position), ai._utility(board))
+                self.assertEqual(score, ai._utility(board))
+
+    def test_connect5_move(self):
+        # player 1 has four in the bottom row with both ends open
+        board = np.zeros((6, 7))
+        board[0][1:5] = 1
+        board[1][1:4] = 2
+        ai = Minimax_AI(2, 1, 6, 7, book=None, connect=5)
+        self.assertIn(ai.make_move(board), (0, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = TranspositionTable(memory_mb=0.001)
+
+    def test_size(self):
+        self.assertEqual(self.table.size, 1024 // TranspositionTable.ENTRY_BYTES)
+
+    def test_store_get(self):
+        self.assertIsNone(self.table.get(12345))
+        self.table.store(12345, 3, EXACT, 7, 2)
+        self.assertEqual(self.table.get(12345), (3, EXACT, 7, 2))
+        self.assertEqual(self.table.probes, 2)
+        self.assertEqual(self.table.hits, 1)
+
+    def test_peek(self):
+        self.table.store(12345, 3, EXACT, 7, 2)
+        self.assertEqual(self.table.peek(12345), (3, EXACT, 7, 2))
+        self.assertIsNone(self.table.peek(54321))
+        self.assertEqual(self.table.probes, 0)
+        self.assertEqual(self.table.hits, 0)
+
+    def test_replacement(self):
+        size = self.table.size
+        self.table.store(1, 5, LOWER, 10, 3)
+        # same slot, smaller depth in the same search: keep the deeper entry
+        self.table.store(1 + size, 2, UPPER, -4, 1)
+        self.assertEqual(self.table.get(1), (5, LOWER, 10, 3))
+        self.assertIsNone(self.table.get(1 + size))
+        # entries of an old search are always replaced
+        self.table.new_search()
+        self.table.store(1 + size, 2, UPPER, -4, 1)
+        self.assertEqual(self.table.get(1 + size), (2, UPPER, -4, 1))
+        self.assertIsNone(self.table.get(1))
+
+    def test_clear(self):
+        self.table.store(1, 5, EXACT, 10, 3)
+        self.table.clear()
+        self.assertIsNone(self.table.get(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
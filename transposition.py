@@ -0,0 +1,92 @@
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+    """Fixed size cache of search results keyed by the Zobrist key of a position.
+
+    Every slot keeps one entry (key, depth, flag, value, move, generation):
+        * depth -> number of moves searched below the position
+        * flag -> EXACT, LOWER (value is a lower bound) or UPPER (upper bound)
+        * value -> score found by the search
+        * move -> best column found, or None
+        * generation -> search that stored the entry
+
+    The entries are kept in one preallocated list per field, so storing a
+    result does not create objects that the garbage collector has to track.
+
+    The number of slots comes from memory_mb. When two positions fall in the
+    same slot the new entry replaces the old one if the old one belongs to a
+    previous search or was searched to a smaller or equal depth, so the table
+    never grows and keeps the most expensive results of the current search.
+
+    It has the next instances variables:
+        * size -> number of slots in the table
+        * probes -> number of lookups
+        * hits -> number of lookups that found the position
+
+    It has the next public methods:
+        * .get(key) -> returns (depth, flag, value, move) or None
+        * .peek(key) -> same as get, without counting a probe
+        * .store(key, depth, flag, value, move) -> saves a search result
+        * .new_search() -> starts a new generation of entries
+        * .clear() -> removes all the entries
+    """
+
+    # approximate size in bytes of one slot with its entry
+    ENTRY_BYTES = 128
+
+    def __init__(self, memory_mb=16):
+        """Create an empty table that uses about memory_mb megabytes."""
+        self._size = max(1, int(memory_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.clear()
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        """Returns (depth, flag, value, move) stored for key or None."""
+        self.probes += 1
+        index = key % self._size
+        if self._keys[index] != key:
+            return None
+        self.hits += 1
+        return self._depths[index], self._flags[index], self._values[index], self._moves[index]
+
+    def peek(self, key):
+        """Returns (depth, flag, value, move) stored for key or None, without
+        changing probes and hits (to read the table outside the search)."""
+        index = key % self._size
+        if self._keys[index] != key:
+            return None
+        return self._depths[index], self._flags[index], self._values[index], self._moves[index]
+
+    def store(self, key, depth, flag, value, move):
+        """Saves a search result if the replacement policy allows it."""
+        index = key % self._size
+        if self._keys[index] == key or self._generations[index] != self._generation or self._depths[index] <= depth:
+            self._keys[index] = key
+            self._depths[index] = depth
+            self._flags[index] = flag
+            self._values[index] = value
+            self._moves[index] = move
+            self._generations[index] = self._generation
+
+    def new_search(self):
+        """Marks the current entries as old, so they are replaced first."""
+        self._generation += 1
+
+    def clear(self):
+        """Removes all the entries."""
+        # key -1 is never a Zobrist key and generation -1 is always old
+        self._keys = [-1] * self._size
+        self._depths = [0] * self._size
+        self._flags = [EXACT] * self._size
+        self._values = [0] * self._size
+        self._moves = [None] * self._size
+        self._generations = [-1] * self._size
+        self._generation = 0
+        self.probes = 0
+        self.hits = 0